@@ -0,0 +1,44 @@
+"""Add covering indexes for intelligence sentiment aggregates
+
+Revision ID: 014_add_intelligence_covering_indexes
+Revises: 013_add_hotelling_t2_score
+Create Date: 2026-10-17
+
+The intelligence analyzers aggregate (power_score + moral_score) / 2 for
+entity mentions joined to articles in a publish_date window. This migration adds:
+1. A partial covering index on entity_mentions (entity_id, article_id) that
+   includes both scores, so scored mentions can be read index-only
+2. A covering index on news_articles (publish_date, id, source_id) so the
+   date window filter and join keys come from the index
+
+Indexes are built CONCURRENTLY to avoid locking the tables during creation.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '014_add_intelligence_covering_indexes'
+down_revision = '013_add_hotelling_t2_score'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_entity_mentions_entity_article_scores
+            ON entity_mentions (entity_id, article_id)
+            INCLUDE (power_score, moral_score)
+            WHERE power_score IS NOT NULL AND moral_score IS NOT NULL
+        """)
+
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_news_articles_publish_date_covering
+            ON news_articles (publish_date, id, source_id)
+        """)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_news_articles_publish_date_covering")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_entity_mentions_entity_article_scores")
@@ -0,0 +1,58 @@
+"""Add stored sentiment_score column to entity_mentions
+
+Revision ID: 015_add_entity_mention_sentiment_score
+Revises: 014_add_intelligence_covering_indexes
+Create Date: 2026-10-17
+
+The intelligence analyzers average (power_score + moral_score) / 2 over
+entity mentions in every sentiment aggregate. This migration adds:
+1. A generated column sentiment_score holding that value, maintained by
+   Postgres on insert/update (NULL when either score is NULL)
+2. A partial index on entity_mentions (entity_id) that includes
+   sentiment_score, so per-entity aggregates read a single stored column
+3. Drops idx_entity_mentions_entity_article_scores from migration 014; it
+   covers the raw scores, which no aggregate reads any more
+
+Indexes are built and dropped CONCURRENTLY to avoid locking the table.
+Adding the STORED column rewrites entity_mentions once.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '015_add_entity_mention_sentiment_score'
+down_revision = '014_add_intelligence_covering_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        ALTER TABLE entity_mentions
+        ADD COLUMN IF NOT EXISTS sentiment_score DOUBLE PRECISION
+        GENERATED ALWAYS AS ((power_score + moral_score) / 2.0) STORED
+    """)
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_entity_mentions_entity_sentiment
+            ON entity_mentions (entity_id)
+            INCLUDE (sentiment_score)
+            WHERE sentiment_score IS NOT NULL
+        """)
+
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_entity_mentions_entity_article_scores")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_entity_mentions_entity_article_scores
+            ON entity_mentions (entity_id, article_id)
+            INCLUDE (power_score, moral_score)
+            WHERE power_score IS NOT NULL AND moral_score IS NOT NULL
+        """)
+
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_entity_mentions_entity_sentiment")
+
+    op.execute("ALTER TABLE entity_mentions DROP COLUMN IF EXISTS sentiment_score")
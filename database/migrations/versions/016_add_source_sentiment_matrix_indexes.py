@@ -0,0 +1,45 @@
+"""Add indexes for per-source entity sentiment aggregation
+
+Revision ID: 016_add_source_sentiment_matrix_indexes
+Revises: 015_add_entity_mention_sentiment_score
+Create Date: 2026-10-17
+
+The source divergence detector aggregates average sentiment per
+(source_id, entity_id) for a set of sources over a date window. This migration adds:
+1. A composite index on news_articles (source_id, publish_date) including id,
+   so the source and date filters resolve article ids from the index
+2. A partial index on entity_mentions (article_id, entity_id) including
+   sentiment_score, so the article-to-mention join is index-only
+
+Indexes are built CONCURRENTLY to avoid locking the tables during creation.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '016_add_source_sentiment_matrix_indexes'
+down_revision = '015_add_entity_mention_sentiment_score'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_news_articles_source_publish_date
+            ON news_articles (source_id, publish_date)
+            INCLUDE (id)
+        """)
+
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_entity_mentions_article_entity_sentiment
+            ON entity_mentions (article_id, entity_id)
+            INCLUDE (sentiment_score)
+            WHERE sentiment_score IS NOT NULL
+        """)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_entity_mentions_article_entity_sentiment")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_news_articles_source_publish_date")
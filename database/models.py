@@ -3,7 +3,7 @@ from typing import List, Optional
 import os
 import logging
 
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, JSON, Index, ARRAY, text, Boolean
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, JSON, Index, ARRAY, text, Boolean, Computed
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.dialects.postgresql import JSONB, BYTEA
 from sqlalchemy.orm import relationship
@@ -147,6 +147,11 @@ class NewsArticle(Base):
         Index('idx_news_articles_processed_at', 'processed_at'),
         Index('idx_news_articles_analysis_status', 'analysis_status'),
         Index('idx_news_articles_batch_id', 'batch_id'),
+        # Covers date-window scans that join mentions and group by source
+        Index('idx_news_articles_publish_date_covering', 'publish_date', 'id', 'source_id'),
+        # Per-source date-window scans for source x entity sentiment matrices
+        Index('idx_news_articles_source_publish_date', 'source_id', 'publish_date',
+              postgresql_include=['id']),
     )
     
     def __repr__(self):
@@ -187,6 +192,8 @@ class EntityMention(Base):
     # Sentiment scores
     power_score = Column(Float)  # strong/weak dimension (-2 to +2)
     moral_score = Column(Float)  # good/evil dimension (-2 to +2)
+    # Combined sentiment, maintained by Postgres (NULL if either score is NULL)
+    sentiment_score = Column(Float, Computed('(power_score + moral_score) / 2.0', persisted=True))
     
     # Sample mentions with context
     mentions = Column(JSON)  # List of {text, context} objects
@@ -201,6 +208,14 @@ class EntityMention(Base):
         Index('idx_entity_mentions_entity_id', 'entity_id'),
         Index('idx_entity_mentions_article_id', 'article_id'),
         Index('idx_entity_mentions_scores', 'power_score', 'moral_score'),
+        # Index-only access to scored mentions for the intelligence aggregates
+        Index('idx_entity_mentions_entity_sentiment', 'entity_id',
+              postgresql_include=['sentiment_score'],
+              postgresql_where=text('sentiment_score IS NOT NULL')),
+        # Article-driven joins that group mentions by entity
+        Index('idx_entity_mentions_article_entity_sentiment', 'article_id', 'entity_id',
+              postgresql_include=['sentiment_score'],
+              postgresql_where=text('sentiment_score IS NOT NULL')),
     )
     
     def __repr__(self):
@@ -6,19 +6,36 @@ Implements shared patterns for data access, statistical computations, and result
 """
 
 import logging
+import math
 import numpy as np
 from abc import ABC, abstractmethod
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple, Any
 from scipy import stats
 from sqlalchemy.orm import Session
-from sqlalchemy import func, text
+from sqlalchemy import column, func, select, table, text
 
 from database.models import NewsArticle, Entity, EntityMention, NewsSource
 from statistical_database.db_manager import StatisticalDBManager
 
 logger = logging.getLogger(__name__)
 
+# Entity id lists longer than this are joined through a temp table instead of
+# being inlined as IN (...) literals, which Postgres plans poorly at that size
+ENTITY_ID_TEMP_TABLE_THRESHOLD = 1000
+
+_entity_id_table = table('tmp_entity_ids', column('id'))
+
+
+@lru_cache(maxsize=128)
+def _iso_week_boundaries(iso_year: int, iso_week: int) -> Tuple[datetime, datetime]:
+    """Get Monday 00:00:00 and Sunday 23:59:59 for an ISO calendar week."""
+    monday = datetime.combine(date.fromisocalendar(iso_year, iso_week, 1), datetime.min.time())
+    sunday = monday + timedelta(days=6, hours=23, minutes=59, seconds=59)
+    return monday, sunday
+
+
 class BaseIntelligenceAnalyzer(ABC):
     """
     Base class for all intelligence analyzers.
@@ -78,12 +95,41 @@ class BaseIntelligenceAnalyzer(ABC):
         Returns:
             Tuple of (week_start, week_end)
         """
-        days_since_monday = date.weekday()
-        monday = date - timedelta(days=days_since_monday)
-        monday = monday.replace(hour=0, minute=0, second=0, microsecond=0)
-        sunday = monday + timedelta(days=6, hours=23, minutes=59, seconds=59)
+        iso_year, iso_week, _ = date.isocalendar()
+        monday, sunday = _iso_week_boundaries(iso_year, iso_week)
+        if date.tzinfo is not None:
+            monday, sunday = monday.replace(tzinfo=date.tzinfo), sunday.replace(tzinfo=date.tzinfo)
         return monday, sunday
     
+    def entity_id_filter(self, id_column, entity_ids: List[int]):
+        """
+        Build a membership predicate for a precomputed list of entity ids.
+        
+        Short lists become a plain IN (...); longer ones are loaded into a
+        session-local temp table so the planner sees a single semi-join.
+        
+        Args:
+            id_column: Column to filter, e.g. EntityMention.entity_id
+            entity_ids: Entity ids to match
+            
+        Returns:
+            SQL expression usable in a where() clause
+        """
+        if len(entity_ids) <= ENTITY_ID_TEMP_TABLE_THRESHOLD:
+            return id_column.in_(entity_ids)
+        
+        self.session.execute(text(
+            "CREATE TEMP TABLE IF NOT EXISTS tmp_entity_ids (id integer PRIMARY KEY)"
+        ))
+        self.session.execute(text("TRUNCATE tmp_entity_ids"))
+        self.session.execute(
+            text("INSERT INTO tmp_entity_ids (id) VALUES (:id)"),
+            [{'id': entity_id} for entity_id in set(entity_ids)]
+        )
+        self.session.execute(text("ANALYZE tmp_entity_ids"))
+        
+        return id_column.in_(select(_entity_id_table.c.id))
+    
     def get_active_entities(self, 
                            start_date: datetime, 
                            end_date: datetime,
@@ -108,33 +154,47 @@ class BaseIntelligenceAnalyzer(ABC):
         min_mentions = min_mentions or self.min_mentions_threshold
         min_sources = min_sources or self.min_sources_threshold
         
-        query = self.session.query(
-            Entity.id,
-            Entity.name,
-            Entity.entity_type,
-            func.count(EntityMention.id).label('mention_count'),
-            func.count(func.distinct(NewsArticle.source_id)).label('source_count'),
-            func.avg((EntityMention.power_score + EntityMention.moral_score) / 2.0).label('avg_sentiment')
-        ).join(
-            EntityMention, Entity.id == EntityMention.entity_id
+        # Aggregate a narrow (entity_id, source_id, sentiment) projection of the
+        # window first, then join back to entities for the display columns
+        mention_window = select(
+            EntityMention.entity_id.label('entity_id'),
+            NewsArticle.source_id.label('source_id'),
+            EntityMention.sentiment_score.label('sentiment')
         ).join(
             NewsArticle, EntityMention.article_id == NewsArticle.id
-        ).filter(
+        ).where(
             NewsArticle.publish_date >= start_date,
             NewsArticle.publish_date <= end_date,
-            EntityMention.power_score.isnot(None),
-            EntityMention.moral_score.isnot(None)
+            EntityMention.sentiment_score.isnot(None)
+        ).cte('mention_window')
+        
+        entity_counts = select(
+            mention_window.c.entity_id,
+            func.count().label('mention_count'),
+            func.count(func.distinct(mention_window.c.source_id)).label('source_count'),
+            func.avg(mention_window.c.sentiment).label('avg_sentiment')
         ).group_by(
-            Entity.id, Entity.name, Entity.entity_type
+            mention_window.c.entity_id
         ).having(
-            func.count(EntityMention.id) >= min_mentions,
-            func.count(func.distinct(NewsArticle.source_id)) >= min_sources
+            func.count() >= min_mentions,
+            func.count(func.distinct(mention_window.c.source_id)) >= min_sources
+        ).subquery('entity_counts')
+        
+        stmt = select(
+            Entity.id,
+            Entity.name,
+            Entity.entity_type,
+            entity_counts.c.mention_count,
+            entity_counts.c.source_count,
+            entity_counts.c.avg_sentiment
+        ).join(
+            entity_counts, Entity.id == entity_counts.c.entity_id
         ).order_by(
-            func.count(EntityMention.id).desc()
-        )
+            entity_counts.c.mention_count.desc()
+        ).execution_options(yield_per=500)
         
         entities = []
-        for row in query.all():
+        for row in self.session.execute(stmt):
             entity_data = {
                 'id': row.id,
                 'name': row.name,
@@ -152,20 +212,25 @@ class BaseIntelligenceAnalyzer(ABC):
                           start_date: datetime, 
                           end_date: datetime,
                           min_articles: int = 10,
-                          country_filter: str = None) -> List[Dict[str, Any]]:
+                          country_filter: str = None,
+                          min_entities: int = 0) -> List[Dict[str, Any]]:
         """
         Get sources with sufficient activity for analysis.
         
+        Both thresholds are applied in SQL, so sources that could never
+        qualify are dropped before any per-source work.
+        
         Args:
             start_date: Period start
             end_date: Period end
             min_articles: Minimum articles published
             country_filter: Optional country filter
+            min_entities: Minimum distinct entities mentioned
             
         Returns:
             List of source dictionaries with metadata
         """
-        cache_key = f"sources_{start_date.date()}_{end_date.date()}_{min_articles}_{country_filter}"
+        cache_key = f"sources_{start_date.date()}_{end_date.date()}_{min_articles}_{country_filter}_{min_entities}"
         if cache_key in self._source_cache:
             return self._source_cache[cache_key]
         
@@ -173,7 +238,7 @@ class BaseIntelligenceAnalyzer(ABC):
             NewsSource.id,
             NewsSource.name,
             NewsSource.country,
-            func.count(NewsArticle.id).label('article_count'),
+            func.count(func.distinct(NewsArticle.id)).label('article_count'),
             func.count(func.distinct(EntityMention.entity_id)).label('entity_count')
         ).join(
             NewsArticle, NewsSource.id == NewsArticle.source_id
@@ -190,9 +255,11 @@ class BaseIntelligenceAnalyzer(ABC):
         query = query.group_by(
             NewsSource.id, NewsSource.name, NewsSource.country
         ).having(
-            func.count(NewsArticle.id) >= min_articles
+            # Distinct, as the mention join repeats each article once per mention
+            func.count(func.distinct(NewsArticle.id)) >= min_articles,
+            func.count(func.distinct(EntityMention.entity_id)) >= min_entities
         ).order_by(
-            func.count(NewsArticle.id).desc()
+            func.count(func.distinct(NewsArticle.id)).desc()
         )
         
         sources = []
@@ -212,7 +279,7 @@ class BaseIntelligenceAnalyzer(ABC):
     def get_entity_sentiment_by_source(self, 
                                       entity_id: int,
                                       start_date: datetime,
-                                      end_date: datetime) -> Dict[int, float]:
+                                      end_date: datetime) -> Tuple[np.ndarray, np.ndarray]:
         """
         Get entity sentiment aggregated by source.
         
@@ -222,7 +289,7 @@ class BaseIntelligenceAnalyzer(ABC):
             end_date: Period end
             
         Returns:
-            Dictionary mapping source_id -> average_sentiment
+            Tuple of parallel arrays (source_ids: int32, sentiments: float32)
         """
         cache_key = f"sentiment_{entity_id}_{start_date.date()}_{end_date.date()}"
         if cache_key in self._sentiment_cache:
@@ -230,7 +297,7 @@ class BaseIntelligenceAnalyzer(ABC):
         
         query = self.session.query(
             NewsArticle.source_id,
-            func.avg((EntityMention.power_score + EntityMention.moral_score) / 2.0).label('avg_sentiment'),
+            func.avg(EntityMention.sentiment_score).label('avg_sentiment'),
             func.count(EntityMention.id).label('mention_count')
         ).join(
             EntityMention, NewsArticle.id == EntityMention.article_id
@@ -238,18 +305,18 @@ class BaseIntelligenceAnalyzer(ABC):
             EntityMention.entity_id == entity_id,
             NewsArticle.publish_date >= start_date,
             NewsArticle.publish_date <= end_date,
-            EntityMention.power_score.isnot(None),
-            EntityMention.moral_score.isnot(None)
+            EntityMention.sentiment_score.isnot(None)
         ).group_by(
             NewsArticle.source_id
         ).having(
             func.count(EntityMention.id) >= 3  # At least 3 mentions per source
         )
         
-        sentiment_by_source = {}
-        for row in query.all():
-            sentiment_by_source[row.source_id] = float(row.avg_sentiment)
+        rows = query.all()
+        source_ids = np.fromiter((row.source_id for row in rows), dtype=np.int32, count=len(rows))
+        sentiments = np.fromiter((row.avg_sentiment for row in rows), dtype=np.float32, count=len(rows))
         
+        sentiment_by_source = (source_ids, sentiments)
         self._sentiment_cache[cache_key] = sentiment_by_source
         return sentiment_by_source
     
@@ -272,15 +339,14 @@ class BaseIntelligenceAnalyzer(ABC):
         """
         query = self.session.query(
             EntityMention.entity_id,
-            func.avg((EntityMention.power_score + EntityMention.moral_score) / 2.0).label('avg_sentiment')
+            func.avg(EntityMention.sentiment_score).label('avg_sentiment')
         ).join(
             NewsArticle, EntityMention.article_id == NewsArticle.id
         ).filter(
             NewsArticle.source_id == source_id,
             NewsArticle.publish_date >= start_date,
             NewsArticle.publish_date <= end_date,
-            EntityMention.power_score.isnot(None),
-            EntityMention.moral_score.isnot(None)
+            EntityMention.sentiment_score.isnot(None)
         )
         
         if entity_filter:
@@ -302,7 +368,8 @@ class BaseIntelligenceAnalyzer(ABC):
     
     def calculate_p_value_two_tailed(self, z_score: float) -> float:
         """Calculate two-tailed p-value from z-score."""
-        return 2 * (1 - stats.norm.cdf(abs(z_score)))
+        # Scalar libm erfc; avoids scipy ufunc dispatch for one value
+        return math.erfc(abs(z_score) * 0.7071067811865475)
     
     def test_variance_equality(self, sample1: List[float], sample2: List[float]) -> Tuple[float, float]:
         """
@@ -352,18 +419,18 @@ class BaseIntelligenceAnalyzer(ABC):
             logger.warning(f"Correlation calculation failed: {e}")
             return None
     
-    def store_finding(self,
-                     finding_type: str,
-                     title: str,
-                     description: str,
-                     p_value: float,
-                     severity_score: float,
-                     event_start: datetime,
-                     baseline_value: float = None,
-                     current_value: float = None,
-                     **kwargs) -> int:
+    def build_finding(self,
+                      finding_type: str,
+                      title: str,
+                      description: str,
+                      p_value: float,
+                      severity_score: float,
+                      event_start: datetime,
+                      baseline_value: float = None,
+                      current_value: float = None,
+                      **kwargs) -> Dict[str, Any]:
         """
-        Store a statistical finding with consistent formatting.
+        Build a statistical finding record with consistent formatting.
         
         Args:
             finding_type: Type of analysis finding
@@ -377,7 +444,7 @@ class BaseIntelligenceAnalyzer(ABC):
             **kwargs: Additional finding-specific data
             
         Returns:
-            Finding ID
+            Keyword arguments for StatisticalDBManager.store_statistical_finding()
         """
         # Determine dashboard category from finding type
         category_map = {
@@ -391,7 +458,7 @@ class BaseIntelligenceAnalyzer(ABC):
         # Calculate priority score based on severity and significance
         priority_score = severity_score * (1 - p_value) if p_value < 1 else severity_score
         
-        return self.statistical_db.store_statistical_finding(
+        return dict(
             finding_type=finding_type,
             title=title,
             description=description,
@@ -405,6 +472,40 @@ class BaseIntelligenceAnalyzer(ABC):
             **kwargs
         )
     
+    def store_finding(self,
+                     finding_type: str,
+                     title: str,
+                     description: str,
+                     p_value: float,
+                     severity_score: float,
+                     event_start: datetime,
+                     baseline_value: float = None,
+                     current_value: float = None,
+                     **kwargs) -> int:
+        """
+        Store a statistical finding with consistent formatting.
+        
+        Takes the same arguments as build_finding().
+        
+        Returns:
+            Finding ID
+        """
+        return self.statistical_db.store_statistical_finding(
+            **self.build_finding(
+                finding_type, title, description, p_value, severity_score,
+                event_start, baseline_value, current_value, **kwargs
+            )
+        )
+    
+    def store_findings(self, findings: List[Dict[str, Any]]) -> List[int]:
+        """
+        Store records from build_finding() in a single transaction.
+        
+        Returns:
+            Finding IDs in input order
+        """
+        return self.statistical_db.store_statistical_findings_bulk(findings)
+    
     def clear_caches(self):
         """Clear internal caches to free memory."""
         self._entity_cache.clear()
@@ -69,7 +69,7 @@ class PolarizationDetector(BaseIntelligenceAnalyzer):
             self.log_analysis_complete("polarization", len(findings), duration)
             return findings
         except Exception as e:
-            logger.error(f"Polarization analysis failed: {e}")
+            logger.error("Polarization analysis failed: %s", e)
             return []
         finally:
             self.clear_caches()
@@ -101,7 +101,7 @@ class PolarizationDetector(BaseIntelligenceAnalyzer):
             min_sources=self.min_sources_per_entity
         )
         
-        logger.info(f"Analyzing {len(entities)} entities for polarization")
+        logger.info("Analyzing %d entities for polarization", len(entities))
         
         findings = []
         for entity in entities:
@@ -114,7 +114,7 @@ class PolarizationDetector(BaseIntelligenceAnalyzer):
             if polarization:
                 findings.append(polarization)
         
-        logger.info(f"Detected {len(findings)} significant polarization increases")
+        logger.info("Detected %d significant polarization increases", len(findings))
         return findings
     
     
@@ -141,25 +141,22 @@ class PolarizationDetector(BaseIntelligenceAnalyzer):
         entity_name = entity['name']
         
         # Get baseline sentiment distribution across sources
-        baseline_sentiments = self.get_entity_sentiment_by_source(
+        _, baseline_sentiments = self.get_entity_sentiment_by_source(
             entity_id, baseline_start, baseline_end
         )
         
         # Get current sentiment distribution across sources
-        current_sentiments = self.get_entity_sentiment_by_source(
+        current_source_ids, current_sentiments = self.get_entity_sentiment_by_source(
             entity_id, current_start, current_end
         )
         
-        if not baseline_sentiments or not current_sentiments:
-            return None
-        
-        if len(baseline_sentiments) < self.min_sources_per_entity or \
-           len(current_sentiments) < self.min_sources_per_entity:
+        if baseline_sentiments.size < self.min_sources_per_entity or \
+           current_sentiments.size < self.min_sources_per_entity:
             return None
         
         # Calculate polarization metrics
-        baseline_variance = np.var(list(baseline_sentiments.values()))
-        current_variance = np.var(list(current_sentiments.values()))
+        baseline_variance = float(np.var(baseline_sentiments))
+        current_variance = float(np.var(current_sentiments))
         
         variance_increase = current_variance - baseline_variance
         relative_increase = variance_increase / baseline_variance if baseline_variance > 0 else float('inf')
@@ -172,10 +169,10 @@ class PolarizationDetector(BaseIntelligenceAnalyzer):
             return None
         
         # Detect bimodal distribution (true polarization vs just increased variance)
-        bimodality_score = self._calculate_bimodality_score(list(current_sentiments.values()))
+        bimodality_score = self._calculate_bimodality_score(current_sentiments)
         
         # Identify polarized source clusters
-        source_clusters = self._identify_polarized_clusters(current_sentiments)
+        source_clusters = self._identify_polarized_clusters(current_source_ids, current_sentiments)
         
         # Create polarization finding
         finding_id = self._create_polarization_finding(
@@ -206,24 +203,21 @@ class PolarizationDetector(BaseIntelligenceAnalyzer):
     
     
     def _test_variance_increase(self, 
-                              baseline_sentiments: Dict[int, float],
-                              current_sentiments: Dict[int, float]) -> float:
+                              baseline_sentiments: np.ndarray,
+                              current_sentiments: np.ndarray) -> float:
         """
         Test if the increase in variance is statistically significant.
         
         Uses Levene's test for variance equality
         """
-        baseline_values = list(baseline_sentiments.values())
-        current_values = list(current_sentiments.values())
-        
         # Use Levene's test for variance difference
         try:
-            statistic, p_value = self.test_variance_equality(baseline_values, current_values)
+            statistic, p_value = self.test_variance_equality(baseline_sentiments, current_sentiments)
             return p_value
         except:
             return 1.0  # Unable to compute
     
-    def _calculate_bimodality_score(self, sentiments: List[float]) -> float:
+    def _calculate_bimodality_score(self, sentiments: np.ndarray) -> float:
         """
         Calculate bimodality score to detect true polarization.
         
@@ -235,8 +229,6 @@ class PolarizationDetector(BaseIntelligenceAnalyzer):
         if len(sentiments) < 4:
             return 0.0
         
-        sentiments = np.array(sentiments)
-        
         # Calculate bimodality coefficient
         # BC = (skew^2 + 1) / (kurtosis + 3 * (n-1)^2 / ((n-2)*(n-3)))
         n = len(sentiments)
@@ -255,56 +247,61 @@ class PolarizationDetector(BaseIntelligenceAnalyzer):
             
             return bimodality_score
         except Exception as e:
-            logger.warning(f"Bimodality calculation failed: {e}")
+            logger.warning("Bimodality calculation failed: %s", e)
             return 0.0
     
-    def _identify_polarized_clusters(self, source_sentiments: Dict[int, float]) -> List[Dict[str, Any]]:
+    def _identify_polarized_clusters(self,
+                                     source_ids: np.ndarray,
+                                     sentiments: np.ndarray) -> List[Dict[str, Any]]:
         """
         Identify clusters of sources with similar sentiment (polarized groups).
         
         Uses simple threshold-based clustering to identify polarized source groups
         
+        Args:
+            source_ids: Source IDs, parallel to sentiments
+            sentiments: Average sentiment per source
+        
         Returns:
             List of cluster dictionaries with source_ids, centroid, size
         """
-        if len(source_sentiments) < 4:
+        if sentiments.size < 4:
             return []
         
-        sentiments = list(source_sentiments.values())
-        
-        # Simple approach: split at median and see if we get distinct groups
-        median_sentiment = np.median(sentiments)
+        # Simple approach: split at median and see if we get distinct groups.
+        # Partial selection is enough to locate the middle element(s).
+        n = sentiments.size
+        mid = n // 2
+        if n % 2:
+            median_sentiment = np.partition(sentiments, mid)[mid]
+        else:
+            partitioned = np.partition(sentiments, [mid - 1, mid])
+            median_sentiment = (partitioned[mid - 1] + partitioned[mid]) / 2.0
         std_sentiment = np.std(sentiments)
         
         # Use 0.5 standard deviations as threshold for cluster separation
         threshold = max(0.5, std_sentiment * 0.5)
         
-        positive_cluster = []
-        negative_cluster = []
-        
-        for source_id, sentiment in source_sentiments.items():
-            if sentiment > median_sentiment + threshold:
-                positive_cluster.append(source_id)
-            elif sentiment < median_sentiment - threshold:
-                negative_cluster.append(source_id)
+        positive_mask = sentiments > median_sentiment + threshold
+        negative_mask = sentiments < median_sentiment - threshold
         
         clusters = []
-        if len(positive_cluster) >= 2:
-            positive_sentiments = [source_sentiments[sid] for sid in positive_cluster]
+        positive_size = int(np.count_nonzero(positive_mask))
+        if positive_size >= 2:
             clusters.append({
                 'cluster_type': 'positive',
-                'source_ids': positive_cluster,
-                'centroid': float(np.mean(positive_sentiments)),
-                'size': len(positive_cluster)
+                'source_ids': source_ids[positive_mask].tolist(),
+                'centroid': float(np.mean(sentiments[positive_mask])),
+                'size': positive_size
             })
         
-        if len(negative_cluster) >= 2:
-            negative_sentiments = [source_sentiments[sid] for sid in negative_cluster]
+        negative_size = int(np.count_nonzero(negative_mask))
+        if negative_size >= 2:
             clusters.append({
                 'cluster_type': 'negative',
-                'source_ids': negative_cluster,
-                'centroid': float(np.mean(negative_sentiments)),
-                'size': len(negative_cluster)
+                'source_ids': source_ids[negative_mask].tolist(),
+                'centroid': float(np.mean(sentiments[negative_mask])),
+                'size': negative_size
             })
         
         return clusters
@@ -422,7 +419,7 @@ class PolarizationDetector(BaseIntelligenceAnalyzer):
         # TODO: Implement entity polarization timeline
         # Show variance over time, key polarization events, source clusters, etc.
         
-        logger.info(f"Getting polarization history for entity {entity_id}")
+        logger.info("Getting polarization history for entity %s", entity_id)
         
         return {
             'entity_id': entity_id,
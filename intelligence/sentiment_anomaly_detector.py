@@ -3,16 +3,21 @@ Sentiment Anomaly Detector
 
 Detects statistically significant sentiment anomalies using sliding window analysis.
 Focuses on week-to-week changes with low p-values (< 0.01) to identify truly meaningful shifts.
+
+The sentiment aggregates here read the stored entity_mentions.sentiment_score
+column (migration 015) and rely on idx_entity_mentions_entity_sentiment and
+idx_news_articles_publish_date_covering (migration 014) to stay index-only.
 """
 
 import logging
+import math
 import numpy as np
 import time
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any
-from scipy import stats
+from scipy.special import erfc
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
 
 # Import database connections
 from database.models import NewsArticle, Entity, EntityMention, NewsSource
@@ -21,6 +26,66 @@ from intelligence.base_analyzer import BaseIntelligenceAnalyzer
 
 logger = logging.getLogger(__name__)
 
+# Mentions are scored asynchronously by the batch analyzer, so days this recent
+# may still gain scored mentions and are never served from the daily cache
+SCORING_LAG_DAYS = 3
+
+# Late-scraped articles and the scoring backlog can still change the newest
+# baseline weeks, so this many are re-aggregated on every run
+REFRESHED_BASELINE_WEEKS = 3
+
+# Finding text templates, filled with str.format() per finding
+_TITLE_TEMPLATE = "{name}: {magnitude} {direction} sentiment"
+_DESCRIPTION_TEMPLATE = (
+    "{name} sentiment shifted {magnitude} {direction} "
+    "({current:.2f} vs baseline {baseline:.2f}, "
+    "z={z:.2f}, p={p:.4f}) for {days} consecutive days"
+)
+
+
+def _triage(currents: np.ndarray,
+            means: np.ndarray,
+            std_devs: np.ndarray,
+            significance_threshold: float) -> Tuple[np.ndarray, ...]:
+    """
+    Score current sentiment against baselines for many entities at once.
+    
+    Runs in the dtype of its inputs; pass float64 so the p-values of strong
+    anomalies do not underflow.
+    
+    Args:
+        currents: Current-period average sentiment per entity
+        means: Baseline mean per entity
+        std_devs: Baseline standard deviation per entity (already floored)
+        significance_threshold: Two-tailed p-value threshold
+        
+    Returns:
+        Tuple of (indices of significant entities, z-scores, p-values,
+        severity scores, change percents), the last four aligned with the indices
+    """
+    # |z| > 2 is required anyway, so only shifts beyond 2 std need a p-value
+    deviations = currents - means
+    shifted = np.flatnonzero(np.abs(deviations) > 2.0 * std_devs)
+    z_scores = deviations[shifted] / std_devs[shifted]
+    abs_z = np.abs(z_scores)
+    # erfc(|z|/sqrt(2)) is the two-tailed tail mass without 1 - cdf cancellation
+    p_values = erfc(abs_z * 0.7071067811865475)
+    
+    passed = p_values < significance_threshold
+    significant = shifted[passed]
+    severity_scores = np.minimum(1.0, abs_z[passed] / 5.0)  # Cap at z=5
+    
+    # Change relative to the baseline, 0 where the baseline mean is 0
+    changes = deviations[significant]
+    baseline_means = means[significant]
+    change_percents = np.divide(
+        changes, np.abs(baseline_means),
+        out=np.zeros_like(changes), where=baseline_means != 0
+    ) * 100.0
+    
+    return significant, z_scores[passed], p_values[passed], severity_scores, change_percents
+
+
 class SentimentAnomalyDetector(BaseIntelligenceAnalyzer):
     """
     Detects unusual sentiment patterns that deviate significantly from historical baselines.
@@ -48,6 +113,11 @@ class SentimentAnomalyDetector(BaseIntelligenceAnalyzer):
         self.baseline_weeks = baseline_weeks
         self.current_weeks = current_weeks
         self.min_consecutive_days = min_consecutive_days
+        
+        # Analysis windows, set once per run by _run_anomaly_detection()
+        self.current_start: Optional[datetime] = None
+        self.current_end: Optional[datetime] = None
+        self.streak_days: List[date] = []
     
     def analyze(self) -> List[Dict[str, Any]]:
         """
@@ -84,8 +154,9 @@ class SentimentAnomalyDetector(BaseIntelligenceAnalyzer):
         """
         # Get time boundaries
         current_start, current_end = self.get_week_boundaries(target_week)
-        baseline_end = current_start - timedelta(days=1)
-        baseline_start = baseline_end - timedelta(weeks=self.baseline_weeks)
+        self.current_start, self.current_end = current_start, current_end
+        # The same 7 calendar days are checked for every entity, newest first
+        self.streak_days = [current_end.date() - timedelta(days=days_back) for days_back in range(7)]
         
         # Get entities with sufficient activity in current period
         entities = self.get_active_entities(
@@ -96,231 +167,435 @@ class SentimentAnomalyDetector(BaseIntelligenceAnalyzer):
         
         logger.info(f"Analyzing {len(entities)} entities for sentiment anomalies")
         
+        if not entities:
+            return []
+        
+        # Aggregate baseline and current sentiment for all entities up front
+        entity_ids = [entity['id'] for entity in entities]
+        baselines = self._get_or_calculate_baselines(entity_ids)
+        current_sentiments = self._get_period_sentiment_bulk(entity_ids, current_start, current_end)
+        
+        # Entities need both historical and current data to be tested
+        candidates = [
+            entity for entity in entities
+            if entity['id'] in baselines and entity['id'] in current_sentiments
+        ]
+        if not candidates:
+            return []
+        
+        # Screen all candidates at once in float32: only shifts beyond 2 std
+        # can reach p < 0.0455, and float32 is ample to find those
+        n = len(candidates)
+        means = np.fromiter((baselines[e['id']]['mean'] for e in candidates), dtype=np.float32, count=n)
+        std_devs = np.fromiter((baselines[e['id']]['std_dev'] for e in candidates), dtype=np.float32, count=n)
+        currents = np.fromiter((current_sentiments[e['id']] for e in candidates), dtype=np.float32, count=n)
+        candidates = [candidates[i] for i in np.flatnonzero(np.abs(currents - means) > 2.0 * std_devs)]
+        if not candidates:
+            return []
+        
+        # The survivors are scored in float64, where erfc keeps the tiny
+        # p-values of strong anomalies that underflow to 0 in float32
+        n = len(candidates)
+        significant, z_scores, p_values, severity_scores, change_percents = _triage(
+            np.fromiter((current_sentiments[e['id']] for e in candidates), dtype=np.float64, count=n),
+            np.fromiter((baselines[e['id']]['mean'] for e in candidates), dtype=np.float64, count=n),
+            np.fromiter((baselines[e['id']]['std_dev'] for e in candidates), dtype=np.float64, count=n),
+            self.significance_threshold
+        )
+        if significant.size == 0:
+            return []
+        
+        # Daily breakdown only for the significant entities, in one query
+        daily_sentiments = self._get_daily_sentiments(
+            [candidates[i]['id'] for i in significant], self.streak_days[-1], self.streak_days[0]
+        )
+        # Also drop any unsettled days cached by earlier runs
+        self.statistical_db.prune_entity_daily_sentiment(
+            self.streak_days[-1],
+            datetime.utcnow().date() - timedelta(days=SCORING_LAG_DAYS + 1)
+        )
+        
+        records = []
         findings = []
-        for entity in entities:
-            entity_findings = self._detect_entity_anomalies(
-                entity, baseline_start, baseline_end, current_start, current_end
-            )
-            findings.extend(entity_findings)
+        triaged = zip(significant, z_scores, p_values, severity_scores, change_percents)
+        for i, z_score, p_value, severity_score, change_percent in triaged:
+            entity = candidates[i]
+            for record, finding in self._detect_entity_anomalies(
+                entity, baselines[entity['id']], current_sentiments[entity['id']],
+                float(z_score), float(p_value), float(severity_score), float(change_percent),
+                daily_sentiments.get(entity['id'], {})
+            ):
+                records.append(record)
+                findings.append(finding)
+        
+        # Store all findings in one transaction and attach their IDs
+        for finding, finding_id in zip(findings, self.store_findings(records)):
+            finding['finding_id'] = finding_id
         
         return findings
     
     def _detect_entity_anomalies(self, 
                                 entity: Dict[str, Any], 
-                                baseline_start: datetime, 
-                                baseline_end: datetime,
-                                current_start: datetime, 
-                                current_end: datetime) -> List[Dict[str, Any]]:
+                                baseline: Dict[str, Any],
+                                current_sentiment: float,
+                                z_score: float,
+                                p_value: float,
+                                severity_score: float,
+                                change_percent: float,
+                                daily_sentiments: Dict[date, Tuple[float, int]]) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
         """
-        Detect sentiment anomalies for a specific entity.
+        Confirm a statistically significant shift for a specific entity.
         
         Args:
             entity: Entity dictionary from get_active_entities()
-            baseline_start: Start of baseline period
-            baseline_end: End of baseline period
-            current_start: Start of current analysis period
-            current_end: End of current analysis period
+            baseline: Baseline statistics for the entity
+            current_sentiment: Average sentiment in the current period
+            z_score: Z-score of the current sentiment against the baseline
+            p_value: Two-tailed p-value of the z-score
+            severity_score: Severity from 0-1
+            change_percent: Change relative to the baseline mean, in percent
+            daily_sentiments: Day -> (average sentiment, mention count) for the
+                last 7 days of the current period
             
         Returns:
-            List of anomaly finding dictionaries
+            List of (finding record, anomaly finding) pairs from _create_anomaly_finding()
         """
         entity_id = entity['id']
         entity_name = entity['name']
         
-        # Get or calculate baseline statistics
-        baseline = self._get_or_calculate_baseline(entity_id, baseline_start, baseline_end)
-        if not baseline:
-            return []  # Insufficient historical data
-        
-        # Get current period sentiment
-        current_sentiment = self._get_period_sentiment(entity_id, current_start, current_end)
-        if current_sentiment is None:
-            return []  # No current data
+        findings = []
         
-        # Perform statistical test
-        z_score = self.calculate_z_score(
-            current_sentiment, baseline['mean'], baseline['std_dev']
+        # Check for consecutive anomalous days (simplified to current implementation)
+        consecutive_days = self._estimate_consecutive_days(
+            daily_sentiments, baseline['mean'], baseline['std_dev']
         )
-        p_value = self.calculate_p_value_two_tailed(z_score)
         
-        findings = []
-        
-        if p_value < self.significance_threshold and abs(z_score) > 2.0:
-            # Check for consecutive anomalous days (simplified to current implementation)
-            consecutive_days = self._estimate_consecutive_days(
-                entity_id, current_end, baseline['mean'], baseline['std_dev']
+        if consecutive_days >= self.min_consecutive_days:
+            finding = self._create_anomaly_finding(
+                entity_id=entity_id,
+                entity_name=entity_name,
+                baseline_value=baseline['mean'],
+                current_value=current_sentiment,
+                z_score=z_score,
+                p_value=p_value,
+                severity_score=severity_score,
+                change_percent=change_percent,
+                consecutive_days=consecutive_days,
+                event_start_date=self.current_start,
+                event_end_date=self.current_end,
+                sample_count=baseline['sample_count']
             )
-            
-            if consecutive_days >= self.min_consecutive_days:
-                finding = self._create_anomaly_finding(
-                    entity_id=entity_id,
-                    entity_name=entity_name,
-                    baseline_value=baseline['mean'],
-                    current_value=current_sentiment,
-                    z_score=z_score,
-                    p_value=p_value,
-                    consecutive_days=consecutive_days,
-                    event_start_date=current_start,
-                    event_end_date=current_end,
-                    sample_count=baseline['sample_count']
-                )
-                findings.append(finding)
+            findings.append(finding)
         
         return findings
     
-    def _get_or_calculate_baseline(self, 
-                                  entity_id: int, 
-                                  baseline_start: datetime, 
-                                  baseline_end: datetime) -> Optional[Dict[str, Any]]:
+    def _get_or_calculate_baselines(self, 
+                                   entity_ids: List[int]) -> Dict[int, Dict[str, Any]]:
         """
-        Get cached baseline statistics or calculate new ones.
+        Get rolling baseline statistics from weekly partial sums.
+        
+        The baseline covers the baseline_weeks whole ISO weeks before
+        self.current_start. Per-week (sum, sum of squares, count, min, max) rows are
+        cached in the statistical database; only the REFRESHED_BASELINE_WEEKS most
+        recent weeks, plus any week missing from the cache, are aggregated from
+        the main database.
+        Weeks that have left the window are evicted.
         
         Args:
-            entity_id: Entity to get baseline for
-            baseline_start: Start of baseline period
-            baseline_end: End of baseline period
+            entity_ids: Entities to get baselines for
             
         Returns:
-            Dictionary with baseline statistics or None if insufficient data
+            Dictionary mapping entity_id -> baseline statistics. Entities with
+            fewer than 20 data points are omitted.
         """
-        # Try to get cached baseline
-        baseline = self.statistical_db.get_baseline_statistics(
-            metric_type='entity_sentiment',
-            entity_id=entity_id,
-            window_weeks=self.baseline_weeks
-        )
+        week_starts = [
+            (self.current_start - timedelta(weeks=weeks_back)).date()
+            for weeks_back in range(self.baseline_weeks, 0, -1)
+        ]
+        latest_week = week_starts[-1]
+        settled_weeks = week_starts[:-REFRESHED_BASELINE_WEEKS]
+        recent_weeks = week_starts[-REFRESHED_BASELINE_WEEKS:]
+        
+        partials = self.statistical_db.get_entity_weekly_sentiment(week_starts[0], latest_week)
+        
+        # Recent weeks may still gain late or newly scored mentions, so they are always refreshed
+        partials_to_store = self._calculate_weekly_partials(entity_ids, recent_weeks)
+        
+        incomplete_ids = [
+            entity_id for entity_id in entity_ids
+            if any(week not in partials.get(entity_id, {}) for week in settled_weeks)
+        ]
+        if incomplete_ids:
+            partials_to_store.extend(
+                self._calculate_weekly_partials(incomplete_ids, settled_weeks)
+            )
+        
+        for row in partials_to_store:
+            partials.setdefault(row['entity_id'], {})[row['week_start']] = row
         
-        # Check if baseline is recent enough (within last week)
-        if baseline and baseline.get('calculation_date'):
-            age_days = (datetime.utcnow() - baseline['calculation_date']).days
-            if age_days <= 7:  # Use cached baseline if less than a week old
-                return baseline
+        self.statistical_db.store_entity_weekly_sentiment_bulk(partials_to_store)
+        self.statistical_db.prune_entity_weekly_sentiment(week_starts[0])
         
-        # Calculate new baseline
-        return self._calculate_entity_baseline(entity_id, baseline_start, baseline_end)
+        baseline_start = datetime.combine(week_starts[0], datetime.min.time())
+        baseline_end = datetime.combine(latest_week, datetime.min.time()) + \
+            timedelta(days=6, hours=23, minutes=59, seconds=59)
+        
+        baselines = {}
+        baseline_rows = []
+        for entity_id in entity_ids:
+            entity_weeks = partials.get(entity_id, {})
+            baseline_stats = self._combine_weekly_partials(
+                [entity_weeks[week] for week in week_starts if week in entity_weeks]
+            )
+            if baseline_stats is None:
+                continue
+            baselines[entity_id] = baseline_stats
+            
+            baseline_rows.append({
+                'metric_type': 'entity_sentiment',
+                'entity_id': entity_id,
+                'mean_value': baseline_stats['mean'],
+                'std_dev': baseline_stats['std_dev'],
+                'min_value': baseline_stats['min_value'],
+                'max_value': baseline_stats['max_value'],
+                'data_start_date': baseline_start,
+                'data_end_date': baseline_end,
+                'sample_count': baseline_stats['sample_count'],
+                'window_weeks': self.baseline_weeks
+            })
+        
+        # Keep a snapshot of this run's baselines in the statistical database
+        self.statistical_db.store_baseline_statistics_bulk(baseline_rows)
+        
+        return baselines
     
-    def _calculate_entity_baseline(self, 
-                                  entity_id: int, 
-                                  baseline_start: datetime, 
-                                  baseline_end: datetime) -> Optional[Dict[str, Any]]:
+    def _calculate_weekly_partials(self, 
+                                  entity_ids: List[int], 
+                                  week_starts: List[date]) -> List[Dict[str, Any]]:
         """
-        Calculate baseline statistics for an entity using historical data.
+        Aggregate per-entity, per-ISO-week sentiment partial sums.
+        
+        Every requested (entity, week) pair gets a row, with a zero count when
+        the entity had no scored mentions that week, so empty weeks are cached too.
         
         Args:
-            entity_id: Entity to analyze
-            baseline_start: Start date for baseline calculation
-            baseline_end: End date for baseline calculation
+            entity_ids: Entities to aggregate
+            week_starts: Mondays of the weeks to aggregate
             
         Returns:
-            Dictionary with baseline statistics or None if insufficient data
+            List of partial sums rows for store_entity_weekly_sentiment_bulk()
         """
-        # Query historical sentiment data
-        sentiments_query = self.session.query(
-            ((EntityMention.power_score + EntityMention.moral_score) / 2.0).label('sentiment')
+        sentiment = EntityMention.sentiment_score
+        week = func.date_trunc('week', NewsArticle.publish_date)
+        
+        stmt = select(
+            EntityMention.entity_id,
+            week.label('week_start'),
+            func.sum(sentiment).label('sum_value'),
+            func.sum(sentiment * sentiment).label('sum_squares'),
+            func.count(EntityMention.id).label('sample_count'),
+            func.min(sentiment).label('min_value'),
+            func.max(sentiment).label('max_value')
         ).join(
             NewsArticle, EntityMention.article_id == NewsArticle.id
-        ).filter(
-            EntityMention.entity_id == entity_id,
-            NewsArticle.publish_date >= baseline_start,
-            NewsArticle.publish_date <= baseline_end,
-            EntityMention.power_score.isnot(None),
-            EntityMention.moral_score.isnot(None)
+        ).where(
+            self.entity_id_filter(EntityMention.entity_id, entity_ids),
+            NewsArticle.publish_date >= datetime.combine(min(week_starts), datetime.min.time()),
+            NewsArticle.publish_date < datetime.combine(max(week_starts) + timedelta(weeks=1), datetime.min.time()),
+            sentiment.isnot(None)
+        ).group_by(
+            EntityMention.entity_id, week
         )
         
-        sentiments = [row.sentiment for row in sentiments_query.all()]
-        
-        if len(sentiments) < 20:  # Need at least 20 data points
-            return None
+        aggregated = {}
+        for row in self.session.execute(stmt):
+            aggregated[(row.entity_id, row.week_start.date())] = {
+                'sum_value': float(row.sum_value),
+                'sum_squares': float(row.sum_squares),
+                'sample_count': row.sample_count,
+                'min_value': float(row.min_value),
+                'max_value': float(row.max_value)
+            }
         
-        # Calculate statistics
-        sentiments_array = np.array(sentiments)
-        mean_sentiment = float(np.mean(sentiments_array))
-        std_sentiment = float(np.std(sentiments_array))
-        
-        # Ensure std_dev is not zero
-        if std_sentiment < 0.01:
-            std_sentiment = 0.01
-        
-        min_sentiment = float(np.min(sentiments_array))
-        max_sentiment = float(np.max(sentiments_array))
-        percentile_95 = float(np.percentile(sentiments_array, 95))
-        percentile_5 = float(np.percentile(sentiments_array, 5))
-        
-        baseline_stats = {
-            'mean': mean_sentiment,
-            'std_dev': std_sentiment,
-            'min_value': min_sentiment,
-            'max_value': max_sentiment,
-            'percentile_95': percentile_95,
-            'percentile_5': percentile_5,
-            'sample_count': len(sentiments)
+        empty_week = {
+            'sum_value': 0.0, 'sum_squares': 0.0, 'sample_count': 0,
+            'min_value': None, 'max_value': None
         }
+        return [
+            dict(aggregated.get((entity_id, week_start), empty_week),
+                 entity_id=entity_id, week_start=week_start)
+            for entity_id in entity_ids
+            for week_start in week_starts
+        ]
+    
+    def _combine_weekly_partials(self, weeks: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Combine weekly partial sums into baseline statistics.
         
-        # Store baseline in statistical database
-        self.statistical_db.store_baseline_statistics(
-            metric_type='entity_sentiment',
-            entity_id=entity_id,
-            mean_value=mean_sentiment,
-            std_dev=std_sentiment,
-            min_value=min_sentiment,
-            max_value=max_sentiment,
-            data_start_date=baseline_start,
-            data_end_date=baseline_end,
-            sample_count=len(sentiments),
-            window_weeks=self.baseline_weeks,
-            percentile_95=percentile_95,
-            percentile_5=percentile_5
-        )
+        Returns:
+            Baseline statistics, or None with fewer than 20 data points
+        """
+        sample_count = sum(week['sample_count'] for week in weeks)
+        if sample_count < 20:  # Need at least 20 data points
+            return None
         
-        return baseline_stats
+        populated = [week for week in weeks if week['sample_count']]
+        mean = sum(week['sum_value'] for week in weeks) / sample_count
+        variance = sum(week['sum_squares'] for week in weeks) / sample_count - mean * mean
+        
+        return {
+            'mean': mean,
+            # Ensure std_dev is not zero (or negative from rounding)
+            'std_dev': max(math.sqrt(max(variance, 0.0)), 0.01),
+            'min_value': min(week['min_value'] for week in populated),
+            'max_value': max(week['max_value'] for week in populated),
+            'sample_count': sample_count
+        }
     
-    def _get_period_sentiment(self, 
-                             entity_id: int, 
-                             period_start: datetime, 
-                             period_end: datetime) -> Optional[float]:
+    def _get_period_sentiment_bulk(self, 
+                                  entity_ids: List[int], 
+                                  period_start: datetime, 
+                                  period_end: datetime) -> Dict[int, float]:
         """
-        Get average sentiment for entity in a specific time period.
+        Get average sentiment for several entities in a specific time period.
         
         Args:
-            entity_id: Entity to analyze
+            entity_ids: Entities to analyze
             period_start: Start of period
             period_end: End of period
             
         Returns:
-            Average sentiment or None if insufficient data
+            Dictionary mapping entity_id -> average sentiment. Entities with
+            fewer than 5 mentions are omitted.
         """
-        result = self.session.query(
-            func.avg((EntityMention.power_score + EntityMention.moral_score) / 2.0).label('avg_sentiment'),
-            func.count(EntityMention.id).label('mention_count')
+        stmt = select(
+            EntityMention.entity_id,
+            func.avg(EntityMention.sentiment_score).label('avg_sentiment')
         ).join(
             NewsArticle, EntityMention.article_id == NewsArticle.id
-        ).filter(
-            EntityMention.entity_id == entity_id,
+        ).where(
+            self.entity_id_filter(EntityMention.entity_id, entity_ids),
             NewsArticle.publish_date >= period_start,
             NewsArticle.publish_date <= period_end,
-            EntityMention.power_score.isnot(None),
-            EntityMention.moral_score.isnot(None)
-        ).first()
+            EntityMention.sentiment_score.isnot(None)
+        ).group_by(
+            EntityMention.entity_id
+        ).having(
+            func.count(EntityMention.id) >= 5
+        )
+        
+        return {
+            entity_id: float(avg_sentiment)
+            for entity_id, avg_sentiment in self.session.execute(stmt)
+        }
+    
+    def _get_daily_sentiments(self, 
+                             entity_ids: List[int], 
+                             first_day: date, 
+                             last_day: date) -> Dict[int, Dict[date, Tuple[float, int]]]:
+        """
+        Get average sentiment per calendar day for many entities.
+        
+        Settled days, older than SCORING_LAG_DAYS, are served from the
+        entity_daily_sentiment cache in the statistical database; days missing
+        from it are aggregated once and cached. More recent days may still be
+        gaining scores, so they are always aggregated fresh and not cached.
+        
+        Args:
+            entity_ids: Entities to analyze
+            first_day: First day of the period
+            last_day: Last day of the period (inclusive)
+            
+        Returns:
+            Dictionary mapping entity_id -> {day: (average sentiment, mention count)}
+        """
+        today = datetime.utcnow().date()
+        last_settled_day = min(last_day, today - timedelta(days=SCORING_LAG_DAYS + 1))
+        
+        daily_sums = {}
+        if first_day <= last_settled_day:
+            daily_sums = self.statistical_db.get_entity_daily_sentiment(first_day, last_settled_day)
+            settled_days = [
+                first_day + timedelta(days=offset)
+                for offset in range((last_settled_day - first_day).days + 1)
+            ]
+            
+            uncached_ids = [
+                entity_id for entity_id in entity_ids
+                if any(day not in daily_sums.get(entity_id, {}) for day in settled_days)
+            ]
+            if uncached_ids:
+                fresh = self._aggregate_daily_sentiments(uncached_ids, first_day, last_settled_day)
+                # Store empty days too so they are not re-aggregated next run
+                rows = []
+                for entity_id in uncached_ids:
+                    for day in settled_days:
+                        sum_value, sample_count = fresh.get((entity_id, day), (0.0, 0))
+                        daily_sums.setdefault(entity_id, {})[day] = (sum_value, sample_count)
+                        rows.append({'entity_id': entity_id, 'day': day,
+                                     'sum_value': sum_value, 'sample_count': sample_count})
+                self.statistical_db.store_entity_daily_sentiment_bulk(rows)
+        
+        if last_day > last_settled_day:
+            open_first_day = max(first_day, last_settled_day + timedelta(days=1))
+            fresh = self._aggregate_daily_sentiments(entity_ids, open_first_day, last_day)
+            for (entity_id, day), sums in fresh.items():
+                daily_sums.setdefault(entity_id, {})[day] = sums
+        
+        return {
+            entity_id: {
+                day: (sum_value / sample_count, sample_count)
+                for day, (sum_value, sample_count) in days.items()
+                if sample_count
+            }
+            for entity_id, days in daily_sums.items()
+        }
+    
+    def _aggregate_daily_sentiments(self, 
+                                   entity_ids: List[int], 
+                                   first_day: date, 
+                                   last_day: date) -> Dict[Tuple[int, date], Tuple[float, int]]:
+        """
+        Sum sentiment per entity and calendar day in one query.
         
-        if result and result.avg_sentiment is not None and result.mention_count >= 5:
-            return float(result.avg_sentiment)
+        Returns:
+            Dictionary mapping (entity_id, day) -> (sentiment sum, mention count)
+        """
+        day = func.date(NewsArticle.publish_date)
         
-        return None
+        stmt = select(
+            EntityMention.entity_id,
+            day.label('day'),
+            func.sum(EntityMention.sentiment_score).label('sum_sentiment'),
+            func.count(EntityMention.id).label('mention_count')
+        ).join(
+            NewsArticle, EntityMention.article_id == NewsArticle.id
+        ).where(
+            self.entity_id_filter(EntityMention.entity_id, entity_ids),
+            NewsArticle.publish_date >= datetime.combine(first_day, datetime.min.time()),
+            NewsArticle.publish_date < datetime.combine(last_day + timedelta(days=1), datetime.min.time()),
+            EntityMention.sentiment_score.isnot(None)
+        ).group_by(
+            EntityMention.entity_id, day
+        )
+        
+        return {
+            (row.entity_id, row.day): (float(row.sum_sentiment), row.mention_count)
+            for row in self.session.execute(stmt)
+        }
     
     def _estimate_consecutive_days(self, 
-                                  entity_id: int, 
-                                  end_date: datetime, 
+                                  daily_sentiments: Dict[date, Tuple[float, int]], 
                                   baseline_mean: float, 
                                   baseline_std: float) -> int:
         """
         Estimate consecutive days of anomalous sentiment.
         
-        This is a simplified implementation that checks the last few days.
-        A more sophisticated version would analyze daily sentiment patterns.
+        Walks the entity's daily sentiment backwards through self.streak_days
+        until the streak breaks.
         
         Args:
-            entity_id: Entity to check
-            end_date: End date to work backwards from
+            daily_sentiments: Day -> (average sentiment, mention count)
             baseline_mean: Baseline mean for comparison
             baseline_std: Baseline standard deviation
             
@@ -330,20 +605,17 @@ class SentimentAnomalyDetector(BaseIntelligenceAnalyzer):
         consecutive_count = 0
         
         # Check last 7 days for anomalous sentiment
-        for days_back in range(7):
-            day_end = end_date - timedelta(days=days_back)
-            day_start = day_end - timedelta(hours=23, minutes=59, seconds=59)
+        for day in self.streak_days:
+            day_data = daily_sentiments.get(day)
             
-            day_sentiment = self._get_period_sentiment(entity_id, day_start, day_end)
-            
-            if day_sentiment is not None:
-                z_score = self.calculate_z_score(day_sentiment, baseline_mean, baseline_std)
+            if day_data is not None and day_data[1] >= 5:
+                z_score = self.calculate_z_score(day_data[0], baseline_mean, baseline_std)
                 if abs(z_score) > 2.0:  # Anomalous day
                     consecutive_count += 1
                 else:
                     break  # Non-anomalous day breaks the streak
             else:
-                break  # No data breaks the streak
+                break  # Insufficient data breaks the streak
         
         return max(1, consecutive_count)  # At least 1 day
     
@@ -354,10 +626,12 @@ class SentimentAnomalyDetector(BaseIntelligenceAnalyzer):
                                current_value: float,
                                z_score: float,
                                p_value: float,
+                               severity_score: float,
+                               change_percent: float,
                                consecutive_days: int,
                                event_start_date: datetime,
                                event_end_date: datetime,
-                               sample_count: int) -> Dict[str, Any]:
+                               sample_count: int) -> Tuple[Dict[str, Any], Dict[str, Any]]:
         """
         Create a formatted anomaly finding for storage and return.
         
@@ -368,13 +642,16 @@ class SentimentAnomalyDetector(BaseIntelligenceAnalyzer):
             current_value: Current observed value
             z_score: Statistical z-score
             p_value: Statistical p-value
+            severity_score: Severity from 0-1, from _triage()
+            change_percent: Change relative to the baseline mean, from _triage()
             consecutive_days: Number of consecutive anomalous days
             event_start_date: When the anomaly period started
             event_end_date: When the anomaly period ended
             sample_count: Size of baseline sample
             
         Returns:
-            Dictionary with finding details and stored finding_id
+            Tuple of (record for store_findings(), finding details); the
+            caller fills in finding_id once the record is stored
         """
         # Determine sentiment direction and magnitude
         change_magnitude = current_value - baseline_value
@@ -382,13 +659,14 @@ class SentimentAnomalyDetector(BaseIntelligenceAnalyzer):
         magnitude_desc = "dramatically" if abs(z_score) > 3 else "significantly"
         
         # Create title and description
-        title = f"{entity_name}: {magnitude_desc} {direction} sentiment"
-        description = (f"{entity_name} sentiment shifted {magnitude_desc} {direction} "
-                      f"({current_value:.2f} vs baseline {baseline_value:.2f}, "
-                      f"z={z_score:.2f}, p={p_value:.4f}) for {consecutive_days} consecutive days")
-        
-        # Calculate severity score (0-1)
-        severity_score = min(1.0, abs(z_score) / 5.0)  # Cap at z=5
+        title = _TITLE_TEMPLATE.format(
+            name=entity_name, magnitude=magnitude_desc, direction=direction
+        )
+        description = _DESCRIPTION_TEMPLATE.format(
+            name=entity_name, magnitude=magnitude_desc, direction=direction,
+            current=current_value, baseline=baseline_value,
+            z=z_score, p=p_value, days=consecutive_days
+        )
         
         # Create supporting data for dashboard visualization
         supporting_data = {
@@ -400,12 +678,12 @@ class SentimentAnomalyDetector(BaseIntelligenceAnalyzer):
             'chart_data': {
                 'baseline_mean': baseline_value,
                 'current_value': current_value,
-                'change_percent': (change_magnitude / abs(baseline_value)) * 100 if baseline_value != 0 else 0
+                'change_percent': change_percent
             }
         }
         
-        # Store finding in statistical database
-        finding_id = self.store_finding(
+        # Build the statistical database record; stored in bulk by the caller
+        record = self.build_finding(
             finding_type='sentiment_anomaly',
             title=title,
             description=description,
@@ -422,8 +700,8 @@ class SentimentAnomalyDetector(BaseIntelligenceAnalyzer):
             supporting_data=supporting_data
         )
         
-        return {
-            'finding_id': finding_id,
+        return record, {
+            'finding_id': None,
             'entity_id': entity_id,
             'entity_name': entity_name,
             'anomaly_type': 'sentiment_shift',
@@ -8,18 +8,144 @@ indicating potential editorial shifts or emerging polarization around specific t
 import logging
 import numpy as np
 import time
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any
-from scipy import stats
-from scipy.stats import pearsonr
 from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from scipy.linalg.blas import get_blas_funcs
+from scipy.special import erfc
 
-from database.models import NewsArticle, Entity, EntityMention, NewsSource
+from database.models import NewsArticle, Entity, EntityMention
 from statistical_database.db_manager import StatisticalDBManager
 from intelligence.base_analyzer import BaseIntelligenceAnalyzer
 
 logger = logging.getLogger(__name__)
 
+# Below this many sources a plain GEMM is faster than the syrk call overhead
+SYRK_MIN_ROWS = 256
+
+# Late-scraped articles and the scoring backlog can still change the newest
+# historical weeks, so this many are re-aggregated on every run
+REFRESHED_HISTORICAL_WEEKS = 2
+
+
+def _gram(matrix: np.ndarray) -> np.ndarray:
+    """
+    Symmetric product matrix @ matrix.T.
+    
+    For large inputs only one triangle is computed with BLAS syrk, roughly
+    half the FLOPs of a full GEMM, and then mirrored into the other.
+    """
+    if matrix.shape[0] <= SYRK_MIN_ROWS:
+        return matrix @ matrix.T
+    
+    syrk = get_blas_funcs('syrk', (matrix,))
+    # matrix.T is a Fortran-ordered view, so BLAS reads it without a copy;
+    # with trans=1 syrk forms (matrix.T).T @ matrix.T in the upper triangle
+    upper = syrk(1.0, matrix.T, trans=1)
+    return np.triu(upper) + np.triu(upper, 1).T
+
+
+def _pairwise_correlations(values: np.ndarray, present: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pearson correlation between every pair of rows over their shared columns.
+    
+    Each pair is correlated only over the entities both sources cover, which
+    matches pearsonr on the intersected vectors, but all pairs are computed
+    with a handful of matrix products instead of one call per pair.
+    
+    Args:
+        values: Sources x entities sentiment matrix, 0 where missing
+        present: Boolean matrix of the same shape marking observed values
+        
+    Returns:
+        Tuple of (correlation matrix, common-entity count matrix). Correlations
+        are NaN where a pair has no shared variance.
+    """
+    # The raw-moment formulas subtract nearly equal sums, which cancels
+    # catastrophically in float32, so the products run in float64
+    values = values.astype(np.float64)
+    mask = present.astype(np.float64)
+    common = _gram(mask)
+    # sums[i, j] is the sum of row i over the columns shared with row j
+    sums = values @ mask.T
+    sum_squares = (values * values) @ mask.T
+    cross = _gram(values)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        covariance = cross - sums * sums.T / common
+        variance = sum_squares - sums * sums / common
+        # A constant row leaves rounding residue rather than an exact zero
+        variance[variance <= 1e-10 * sum_squares] = 0.0
+        scale = np.sqrt(variance * variance.T)
+        correlations = np.where(scale > 0, covariance / scale, np.nan)
+    
+    return np.clip(correlations, -1.0, 1.0), common
+
+
+def _row_pair_correlations(values: np.ndarray,
+                           present: np.ndarray,
+                           first: np.ndarray,
+                           second: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pearson correlation of many row pairs, each over its own shared entities.
+    
+    Args:
+        values: Sources x entities sentiment matrix, 0 where missing
+        present: Boolean matrix of the same shape marking observed values
+        first: Row index of the first source of each pair
+        second: Row index of the second source of each pair
+        
+    Returns:
+        Tuple of (correlation per pair, shared-entity count per pair).
+        Correlations are NaN where a pair has no shared variance.
+    """
+    shared = (present[first] & present[second]).astype(values.dtype)
+    common = shared.sum(axis=1)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Center each row on the mean of its shared entities only
+        values1 = values[first] * shared
+        values2 = values[second] * shared
+        centered1 = (values1 - (values1.sum(axis=1) / common)[:, None]) * shared
+        centered2 = (values2 - (values2.sum(axis=1) / common)[:, None]) * shared
+        correlations = (centered1 * centered2).sum(axis=1) / np.sqrt(
+            (centered1 * centered1).sum(axis=1) * (centered2 * centered2).sum(axis=1)
+        )
+    
+    return np.clip(correlations, -1.0, 1.0), common.astype(np.int64)
+
+
+def _correlation_change_p_values(historical_correlations: np.ndarray,
+                                 historical_sizes: np.ndarray,
+                                 recent_correlations: np.ndarray,
+                                 recent_sizes: np.ndarray) -> np.ndarray:
+    """
+    Test whether each pair's change in correlation is statistically significant.
+    
+    Compares Fisher z-transformed correlations of the two independent
+    samples. Runs in float64, so the tail probabilities keep double
+    precision even though the sentiment matrices are float32.
+    
+    Returns:
+        Two-tailed p-value per pair; 1.0 where either sample has fewer than 8 entities
+    """
+    historical_sizes = np.asarray(historical_sizes, dtype=np.float64)
+    recent_sizes = np.asarray(recent_sizes, dtype=np.float64)
+    
+    # Fisher's z-transformation; clip so |r| = 1 stays finite
+    z1 = np.arctanh(np.clip(np.asarray(historical_correlations, dtype=np.float64), -0.9999, 0.9999))
+    z2 = np.arctanh(np.clip(np.asarray(recent_correlations, dtype=np.float64), -0.9999, 0.9999))
+    
+    enough = (historical_sizes >= 8) & (recent_sizes >= 8)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        se = np.sqrt(1 / (historical_sizes - 3) + 1 / (recent_sizes - 3))
+        z_stat = np.abs(z1 - z2) / se
+    
+    # Two-tailed p-value straight from the tail, no 1 - cdf cancellation
+    return np.where(enough, erfc(z_stat * 0.7071067811865475), 1.0)
+
+
 class SourceDivergenceDetector(BaseIntelligenceAnalyzer):
     """
     Detects when sources that historically had similar sentiment patterns begin to diverge.
@@ -86,13 +212,24 @@ class SourceDivergenceDetector(BaseIntelligenceAnalyzer):
         """
         # Get time boundaries
         recent_end = target_week
-        recent_start = recent_end - timedelta(weeks=self.recent_weeks)
-        historical_end = recent_start - timedelta(days=1)
-        historical_start = historical_end - timedelta(weeks=self.historical_weeks)
-        
-        # Get sources with sufficient activity in both periods
-        historical_sources = self.get_active_sources(historical_start, historical_end, min_articles=50)
-        recent_sources = self.get_active_sources(recent_start, recent_end, min_articles=10)
+        # The historical period is whole ISO weeks, so it can be assembled from
+        # cached weeks. The recent period starts on the Monday right after it,
+        # so no days fall between the two periods.
+        recent_start, _ = self.get_week_boundaries(recent_end - timedelta(weeks=self.recent_weeks))
+        historical_start = recent_start - timedelta(weeks=self.historical_weeks)
+        historical_end = recent_start - timedelta(microseconds=1)
+        historical_weeks = [
+            (historical_start + timedelta(weeks=i)).date() for i in range(self.historical_weeks)
+        ]
+        
+        # Get sources with sufficient activity in both periods. A pair needs
+        # 8 shared entities, so sources covering fewer can never qualify.
+        historical_sources = self.get_active_sources(
+            historical_start, historical_end, min_articles=50, min_entities=8
+        )
+        recent_sources = self.get_active_sources(
+            recent_start, recent_end, min_articles=10, min_entities=8
+        )
         
         # Find sources active in both periods
         historical_source_ids = {s['id'] for s in historical_sources}
@@ -114,17 +251,51 @@ class SourceDivergenceDetector(BaseIntelligenceAnalyzer):
         
         logger.info(f"Analyzing {len(common_source_ids)} sources across {len(common_entities)} entities")
         
+        # Fetch every source's sentiment for both periods once, up front.
+        # Rows follow source_ids and columns follow common_entities.
+        source_ids = sorted(common_source_ids)
+        source_rows = {source_id: i for i, source_id in enumerate(source_ids)}
+        source_countries = {s['id']: s['country'] for s in recent_sources}
+        # Names come with the active sources, so no per-pair lookups
+        source_names = {s['id']: s['name'] for s in recent_sources}
+        historical = self._build_historical_sentiment_matrix(
+            source_ids, common_entities, historical_weeks
+        )
+        recent = self._build_sentiment_matrix(
+            source_ids, common_entities, recent_start, recent_end
+        )
+        
         # Find historically correlated source pairs and test for divergence
-        findings = []
-        source_pairs = self._get_source_pairs(list(common_source_ids))
+        source_pairs = self._get_historically_correlated_pairs(
+            source_ids, [source_countries[source_id] for source_id in source_ids], *historical
+        )
+        
+        diverging_pairs = self._find_diverging_pairs(source_pairs, source_rows, recent)
         
-        for source1_id, source2_id in source_pairs:
-            divergence = self._analyze_pair_divergence(
-                source1_id, source2_id, common_entities,
+        # Divergent entities for every surviving pair in one vectorized pass
+        pair_rows = np.array(
+            [(source_rows[source1_id], source_rows[source2_id]) for source1_id, source2_id, _ in diverging_pairs],
+            dtype=np.intp
+        ).reshape(-1, 2)
+        pair_entities = self._identify_divergent_entities(pair_rows, *recent, common_entities)
+        
+        findings = []
+        divergence_rows = []
+        finding_records = []
+        for (source1_id, source2_id, divergence), divergent_entities in zip(diverging_pairs, pair_entities):
+            divergence_row, finding_record, finding = self._build_divergence_records(
+                source1_id, source_names[source1_id], source2_id, source_names[source2_id],
+                divergence, divergent_entities,
                 historical_start, historical_end, recent_start, recent_end
             )
-            if divergence:
-                findings.append(divergence)
+            divergence_rows.append(divergence_row)
+            finding_records.append(finding_record)
+            findings.append(finding)
+        
+        # Store all divergences and findings in one transaction each
+        self.statistical_db.store_source_divergences_bulk(divergence_rows)
+        for finding, finding_id in zip(findings, self.store_findings(finding_records)):
+            finding['finding_id'] = finding_id
         
         return findings
     
@@ -155,8 +326,7 @@ class SourceDivergenceDetector(BaseIntelligenceAnalyzer):
             NewsArticle.source_id.in_(source_ids),
             NewsArticle.publish_date >= start_date,
             NewsArticle.publish_date <= end_date,
-            EntityMention.power_score.isnot(None),
-            EntityMention.moral_score.isnot(None)
+            EntityMention.sentiment_score.isnot(None)
         ).group_by(
             EntityMention.entity_id
         ).having(
@@ -168,117 +338,355 @@ class SourceDivergenceDetector(BaseIntelligenceAnalyzer):
         
         return [row.entity_id for row in query.all()]
     
-    def _get_source_pairs(self, source_ids: List[int]) -> List[Tuple[int, int]]:
+    def _build_sentiment_matrix(self,
+                               source_ids: List[int],
+                               entity_ids: List[int],
+                               start_date: datetime,
+                               end_date: datetime) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Generate all possible pairs of sources for correlation analysis.
+        Get average sentiment for every (source, entity) pair in one query.
         
         Args:
-            source_ids: List of source IDs
+            source_ids: Sources, in row order
+            entity_ids: Entities, in column order
+            start_date: Start of time period
+            end_date: End of time period
             
         Returns:
-            List of (source1_id, source2_id) tuples
+            Tuple of (sources x entities float32 sentiment matrix with 0 where
+            the source did not cover the entity, boolean presence matrix).
+            Averages are bounded, so single precision loses nothing that the
+            correlation thresholds can see and halves the matrix traffic.
         """
-        pairs = []
-        for i, source1_id in enumerate(source_ids):
-            for source2_id in source_ids[i+1:]:
-                pairs.append((source1_id, source2_id))
-        return pairs[:50]  # Limit to 50 pairs for performance
+        source_index = {source_id: i for i, source_id in enumerate(source_ids)}
+        entity_index = {entity_id: j for j, entity_id in enumerate(entity_ids)}
+        
+        stmt = select(
+            NewsArticle.source_id,
+            EntityMention.entity_id,
+            func.avg(EntityMention.sentiment_score).label('avg_sentiment')
+        ).join(
+            NewsArticle, EntityMention.article_id == NewsArticle.id
+        ).where(
+            NewsArticle.source_id.in_(source_ids),
+            EntityMention.entity_id.in_(entity_ids),
+            NewsArticle.publish_date >= start_date,
+            NewsArticle.publish_date <= end_date,
+            EntityMention.sentiment_score.isnot(None)
+        ).group_by(
+            NewsArticle.source_id, EntityMention.entity_id
+        ).execution_options(yield_per=5000)
+        
+        # Rows stream straight into the preallocated matrices
+        values = np.zeros((len(source_ids), len(entity_ids)), dtype=np.float32)
+        present = np.zeros((len(source_ids), len(entity_ids)), dtype=bool)
+        for row in self.session.execute(stmt):
+            i, j = source_index[row.source_id], entity_index[row.entity_id]
+            values[i, j] = row.avg_sentiment
+            present[i, j] = True
+        
+        return values, present
     
-    def _analyze_pair_divergence(self,
-                                source1_id: int,
-                                source2_id: int,
-                                common_entities: List[int],
-                                historical_start: datetime,
-                                historical_end: datetime,
-                                recent_start: datetime,
-                                recent_end: datetime) -> Optional[Dict[str, Any]]:
+    def _build_historical_sentiment_matrix(self,
+                                          source_ids: List[int],
+                                          entity_ids: List[int],
+                                          week_starts: List[date]) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Analyze a specific source pair for divergence.
+        Get average historical sentiment for every (source, entity) pair from cached weekly sums.
+        
+        The historical window slides by one week per run. Each run aggregates
+        the REFRESHED_HISTORICAL_WEEKS newest weeks, which may still gain late
+        or newly scored mentions, for all entities; the older settled weeks are
+        only aggregated for entities with a week missing from the cache.
         
         Args:
-            source1_id: First source ID
-            source2_id: Second source ID
-            common_entities: List of entity IDs to analyze
-            historical_start: Start of historical period
-            historical_end: End of historical period
-            recent_start: Start of recent period
-            recent_end: End of recent period
+            source_ids: Sources, in row order
+            entity_ids: Entities, in column order
+            week_starts: Mondays of the historical weeks, oldest first
             
         Returns:
-            Divergence finding dictionary or None
+            Same (values, present) matrices as _build_sentiment_matrix()
         """
-        # Get sentiment vectors for both periods
-        hist_vector1 = self.get_entity_sentiment_vector(
-            source1_id, historical_start, historical_end, common_entities
-        )
-        hist_vector2 = self.get_entity_sentiment_vector(
-            source2_id, historical_start, historical_end, common_entities
-        )
+        first_week, last_week = week_starts[0], week_starts[-1]
+        settled_weeks = week_starts[:-REFRESHED_HISTORICAL_WEEKS]
+        recent_weeks = week_starts[-REFRESHED_HISTORICAL_WEEKS:]
+        
+        coverage = self.statistical_db.get_source_entity_weekly_coverage(first_week, last_week)
+        
+        # Recent weeks may still gain late or newly scored mentions, so they are always refreshed
+        sums = self._calculate_source_weekly_sums(entity_ids, recent_weeks)
+        covered = [(entity_id, week_start) for entity_id in entity_ids for week_start in recent_weeks]
+        
+        incomplete_ids = [
+            entity_id for entity_id in entity_ids
+            if any(week not in coverage.get(entity_id, ()) for week in settled_weeks)
+        ]
+        if incomplete_ids:
+            logger.info(f"Aggregating settled weeks of source sentiment for {len(incomplete_ids)} uncached entities")
+            sums.extend(self._calculate_source_weekly_sums(incomplete_ids, settled_weeks))
+            covered.extend(
+                (entity_id, week_start) for entity_id in incomplete_ids for week_start in settled_weeks
+            )
         
-        recent_vector1 = self.get_entity_sentiment_vector(
-            source1_id, recent_start, recent_end, common_entities
-        )
-        recent_vector2 = self.get_entity_sentiment_vector(
-            source2_id, recent_start, recent_end, common_entities
+        self.statistical_db.store_source_entity_weekly_sentiment_bulk(sums, covered)
+        self.statistical_db.prune_source_entity_weekly_sentiment(first_week)
+        
+        source_index = {source_id: i for i, source_id in enumerate(source_ids)}
+        entity_index = {entity_id: j for j, entity_id in enumerate(entity_ids)}
+        
+        values = np.zeros((len(source_ids), len(entity_ids)), dtype=np.float32)
+        present = np.zeros((len(source_ids), len(entity_ids)), dtype=bool)
+        totals = self.statistical_db.get_source_entity_sentiment_totals(
+            entity_ids, first_week, last_week
         )
+        for source_id, entity_id, sum_value, sample_count in totals:
+            i = source_index.get(source_id)
+            if i is None or not sample_count:
+                continue
+            j = entity_index[entity_id]
+            values[i, j] = sum_value / sample_count
+            present[i, j] = True
+        
+        return values, present
+    
+    def _calculate_source_weekly_sums(self,
+                                     entity_ids: List[int],
+                                     week_starts: List[date]) -> List[Dict[str, Any]]:
+        """
+        Aggregate per-source, per-entity, per-ISO-week sentiment sums.
         
-        # Calculate correlations
-        historical_corr = self.calculate_correlation(hist_vector1, hist_vector2, min_common=8)
-        recent_corr = self.calculate_correlation(recent_vector1, recent_vector2, min_common=8)
+        Sums are taken over all sources, so the cached weeks stay valid when
+        the set of active sources changes between runs.
         
-        if not historical_corr or not recent_corr:
-            return None
+        Args:
+            entity_ids: Entities to aggregate
+            week_starts: Mondays of consecutive weeks to aggregate
+            
+        Returns:
+            List of sums rows for store_source_entity_weekly_sentiment_bulk()
+        """
+        if not entity_ids or not week_starts:
+            return []
         
-        # Check if historical correlation was strong enough
-        if historical_corr['correlation'] < self.min_historical_correlation:
-            return None
+        first_week, last_week = min(week_starts), max(week_starts)
         
-        # Calculate divergence magnitude
-        divergence_magnitude = abs(historical_corr['correlation'] - recent_corr['correlation'])
+        sentiment = EntityMention.sentiment_score
+        week = func.date_trunc('week', NewsArticle.publish_date)
         
-        if divergence_magnitude < self.min_divergence_magnitude:
-            return None
+        stmt = select(
+            NewsArticle.source_id,
+            EntityMention.entity_id,
+            week.label('week_start'),
+            func.sum(sentiment).label('sum_value'),
+            func.count(EntityMention.id).label('sample_count')
+        ).join(
+            NewsArticle, EntityMention.article_id == NewsArticle.id
+        ).where(
+            EntityMention.entity_id.in_(entity_ids),
+            NewsArticle.publish_date >= datetime.combine(first_week, datetime.min.time()),
+            NewsArticle.publish_date < datetime.combine(last_week + timedelta(weeks=1), datetime.min.time()),
+            sentiment.isnot(None)
+        ).group_by(
+            NewsArticle.source_id, EntityMention.entity_id, week
+        ).execution_options(yield_per=5000)
+        
+        return [{
+            'source_id': row.source_id,
+            'entity_id': row.entity_id,
+            'week_start': row.week_start.date(),
+            'sum_value': float(row.sum_value),
+            'sample_count': row.sample_count
+        } for row in self.session.execute(stmt)]
+    
+    def _get_historically_correlated_pairs(self,
+                                          source_ids: List[int],
+                                          countries: List[Optional[str]],
+                                          values: np.ndarray,
+                                          present: np.ndarray) -> List[Tuple[int, int, Dict[str, Any]]]:
+        """
+        Find same-country source pairs whose sentiment was strongly correlated historically.
         
-        # Simple statistical test for correlation change
-        p_value = self._test_correlation_change(historical_corr, recent_corr)
+        Sources are only compared within their own country, so the
+        correlations are computed per country block rather than for the
+        full sources x sources matrix. Sources without a country are not
+        compared with anything.
         
-        if p_value > self.significance_threshold:
-            return None
+        Args:
+            source_ids: Source IDs, in matrix row order
+            countries: Country of each source, in matrix row order
+            values: Historical sentiment matrix from _build_sentiment_matrix()
+            present: Historical presence matrix from _build_sentiment_matrix()
+            
+        Returns:
+            List of (source1_id, source2_id, historical correlation stats)
+            tuples, most correlated first
+        """
+        country_rows = {}
+        for i, country in enumerate(countries):
+            # An unknown country says nothing about whether two sources share one
+            if country is not None:
+                country_rows.setdefault(country, []).append(i)
+        
+        pair_rows1, pair_rows2, pair_correlations, pair_common = [], [], [], []
+        for block in country_rows.values():
+            if len(block) < 2:
+                continue
+            block = np.array(block)
+            correlations, common = _pairwise_correlations(values[block], present[block])
+            
+            rows, cols = np.triu_indices(len(block), k=1)
+            block_correlations = correlations[rows, cols]
+            
+            # NaN correlations compare False and drop out here
+            keep = (common[rows, cols] >= 8) & (block_correlations >= self.min_historical_correlation)
+            pair_rows1.append(block[rows[keep]])
+            pair_rows2.append(block[cols[keep]])
+            pair_correlations.append(block_correlations[keep])
+            pair_common.append(common[rows[keep], cols[keep]])
+        
+        if not pair_correlations:
+            return []
         
-        # Get source names for display
-        source1_name = self._get_source_name(source1_id)
-        source2_name = self._get_source_name(source2_id)
+        pair_rows1 = np.concatenate(pair_rows1)
+        pair_rows2 = np.concatenate(pair_rows2)
+        pair_correlations = np.concatenate(pair_correlations)
+        pair_common = np.concatenate(pair_common)
+        
+        # Keep the 50 strongest pairs for performance; only those get sorted
+        candidates = np.arange(pair_correlations.size)
+        max_pairs = 50
+        if candidates.size > max_pairs:
+            candidates = np.argpartition(-pair_correlations, max_pairs - 1)[:max_pairs]
+        ranked = candidates[np.argsort(-pair_correlations[candidates], kind='stable')]
+        
+        return [
+            (source_ids[pair_rows1[k]], source_ids[pair_rows2[k]], {
+                'correlation': float(pair_correlations[k]),
+                'common_entities': int(pair_common[k]),
+                'sample_size': int(pair_common[k])
+            })
+            for k in ranked
+        ]
+    
+    def _find_diverging_pairs(self,
+                              source_pairs: List[Tuple[int, int, Dict[str, Any]]],
+                              source_rows: Dict[int, int],
+                              recent: Tuple[np.ndarray, np.ndarray]) -> List[Tuple[int, int, Dict[str, Any]]]:
+        """
+        Test every historically correlated pair for significant divergence at once.
         
-        # Identify top divergent entities
-        divergent_entities = self._identify_divergent_entities(
-            recent_vector1, recent_vector2, common_entities
+        Recent correlations, divergence magnitudes and Fisher z p-values are
+        computed as arrays over all pairs; only pairs passing every screen
+        are returned.
+        
+        Args:
+            source_pairs: Result of _get_historically_correlated_pairs()
+            source_rows: Matrix row of each source
+            recent: (values, present) matrices for the recent period
+            
+        Returns:
+            List of (source1_id, source2_id, divergence) tuples, where divergence
+            has historical_corr, recent_corr, divergence_magnitude and p_value
+        """
+        if not source_pairs:
+            return []
+        
+        first = np.array([source_rows[source1_id] for source1_id, _, _ in source_pairs], dtype=np.intp)
+        second = np.array([source_rows[source2_id] for _, source2_id, _ in source_pairs], dtype=np.intp)
+        historical_correlations = np.array([corr['correlation'] for _, _, corr in source_pairs])
+        historical_sizes = np.array([corr['sample_size'] for _, _, corr in source_pairs])
+        
+        recent_correlations, recent_sizes = _row_pair_correlations(*recent, first, second)
+        divergence_magnitudes = np.abs(historical_correlations - recent_correlations)
+        p_values = _correlation_change_p_values(
+            historical_correlations, historical_sizes, recent_correlations, recent_sizes
         )
         
-        # Store divergence in statistical database
-        self.statistical_db.store_source_divergence(
-            source_id_1=source1_id,
-            source_id_2=source2_id,
-            historical_correlation=historical_corr['correlation'],
-            historical_window_start=historical_start,
-            historical_window_end=historical_end,
-            recent_correlation=recent_corr['correlation'],
-            recent_window_start=recent_start,
-            recent_window_end=recent_end,
-            divergence_p_value=p_value,
-            divergence_magnitude=divergence_magnitude,
-            top_divergent_entities=divergent_entities,
-            is_significant=True
+        # NaN recent correlations compare False and drop out here
+        significant = np.flatnonzero(
+            (recent_sizes >= 8) &
+            (divergence_magnitudes >= self.min_divergence_magnitude) &
+            (p_values <= self.significance_threshold)
         )
         
+        diverging_pairs = []
+        for k in significant:
+            source1_id, source2_id, historical_corr = source_pairs[k]
+            recent_size = int(recent_sizes[k])
+            diverging_pairs.append((source1_id, source2_id, {
+                'historical_corr': historical_corr,
+                'recent_corr': {
+                    'correlation': float(recent_correlations[k]),
+                    'common_entities': recent_size,
+                    'sample_size': recent_size
+                },
+                'divergence_magnitude': float(divergence_magnitudes[k]),
+                'p_value': float(p_values[k])
+            }))
+        
+        return diverging_pairs
+    
+    def _build_divergence_records(self,
+                                 source1_id: int,
+                                 source1_name: str,
+                                 source2_id: int,
+                                 source2_name: str,
+                                 divergence: Dict[str, Any],
+                                 divergent_entities: List[Dict[str, Any]],
+                                 historical_start: datetime,
+                                 historical_end: datetime,
+                                 recent_start: datetime,
+                                 recent_end: datetime) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+        """
+        Build the records for a significant divergence.
+        
+        Args:
+            source1_id: First source ID
+            source1_name: First source display name
+            source2_id: Second source ID
+            source2_name: Second source display name
+            divergence: Divergence stats from _find_diverging_pairs()
+            divergent_entities: Top divergent entities for the pair
+            historical_start: Start of historical period
+            historical_end: End of historical period
+            recent_start: Start of recent period
+            recent_end: End of recent period
+            
+        Returns:
+            Tuple of (source divergence row, finding record, divergence finding)
+            for the caller to store. finding_id is filled in once the finding
+            record is stored.
+        """
+        historical_corr = divergence['historical_corr']
+        recent_corr = divergence['recent_corr']
+        divergence_magnitude = divergence['divergence_magnitude']
+        p_value = divergence['p_value']
+        
+        # Divergence row for the statistical database
+        divergence_row = {
+            'source_id_1': source1_id,
+            'source_id_2': source2_id,
+            'historical_correlation': historical_corr['correlation'],
+            'historical_window_start': historical_start,
+            'historical_window_end': historical_end,
+            'recent_correlation': recent_corr['correlation'],
+            'recent_window_start': recent_start,
+            'recent_window_end': recent_end,
+            'divergence_p_value': p_value,
+            'divergence_magnitude': divergence_magnitude,
+            'top_divergent_entities': divergent_entities,
+            'is_significant': True
+        }
+        
         # Create finding for dashboard
-        finding_id = self._create_divergence_finding(
+        finding_record = self._create_divergence_finding(
             source1_id, source1_name, source2_id, source2_name,
             historical_corr, recent_corr, divergence_magnitude, p_value,
             divergent_entities, recent_start, recent_end
         )
         
-        return {
-            'finding_id': finding_id,
+        return divergence_row, finding_record, {
+            'finding_id': None,
             'source1_id': source1_id,
             'source1_name': source1_name,
             'source2_id': source2_id,
@@ -290,77 +698,61 @@ class SourceDivergenceDetector(BaseIntelligenceAnalyzer):
             'divergent_entities': divergent_entities
         }
     
-    def _get_source_name(self, source_id: int) -> str:
-        """Get source name for display purposes."""
-        source = self.session.query(NewsSource).filter(NewsSource.id == source_id).first()
-        return source.name if source else f"Source {source_id}"
-    
-    def _test_correlation_change(self, 
-                                historical_corr: Dict[str, Any], 
-                                recent_corr: Dict[str, Any]) -> float:
-        """
-        Test if the change in correlation is statistically significant.
-        
-        Uses a simplified approach based on sample sizes and correlation difference.
-        """
-        n1 = historical_corr['sample_size']
-        n2 = recent_corr['sample_size']
-        
-        if n1 < 8 or n2 < 8:
-            return 1.0  # Not enough data
-        
-        # Simplified statistical test based on correlation difference
-        r1 = historical_corr['correlation']
-        r2 = recent_corr['correlation']
-        
-        # Fisher's z-transformation (simplified)
-        z1 = 0.5 * np.log((1 + r1) / (1 - r1)) if abs(r1) < 0.99 else 0
-        z2 = 0.5 * np.log((1 + r2) / (1 - r2)) if abs(r2) < 0.99 else 0
-        
-        se = np.sqrt(1/(n1-3) + 1/(n2-3))
-        z_stat = abs(z1 - z2) / se if se > 0 else 0
-        
-        # Two-tailed p-value
-        p_value = 2 * (1 - stats.norm.cdf(z_stat)) if z_stat > 0 else 1.0
-        
-        return min(1.0, p_value)
-    
     def _identify_divergent_entities(self,
-                                   vector1: Dict[int, float],
-                                   vector2: Dict[int, float],
-                                   entity_ids: List[int]) -> List[Dict[str, Any]]:
+                                   pair_rows: np.ndarray,
+                                   values: np.ndarray,
+                                   present: np.ndarray,
+                                   entity_ids: List[int]) -> List[List[Dict[str, Any]]]:
         """
-        Identify entities with the largest sentiment differences between sources.
+        Identify entities with the largest sentiment differences for several source pairs.
         
         Args:
-            vector1: Sentiment vector for source 1
-            vector2: Sentiment vector for source 2
-            entity_ids: List of entity IDs to consider
+            pair_rows: Pairs x 2 array of source matrix rows
+            values: Recent sentiment matrix from _build_sentiment_matrix()
+            present: Recent presence matrix from _build_sentiment_matrix()
+            entity_ids: Entity IDs, in matrix column order
             
         Returns:
-            List of entities with divergence information
+            For each pair, a list of entities with divergence information
         """
-        divergent_entities = []
-        
-        for entity_id in entity_ids:
-            if entity_id in vector1 and entity_id in vector2:
-                sentiment_diff = abs(vector1[entity_id] - vector2[entity_id])
-                
-                # Get entity name
-                entity = self.session.query(Entity).filter(Entity.id == entity_id).first()
-                entity_name = entity.name if entity else f"Entity {entity_id}"
-                
-                divergent_entities.append({
+        if len(pair_rows) == 0 or not entity_ids:
+            return [[] for _ in range(len(pair_rows))]
+        
+        first, second = pair_rows[:, 0], pair_rows[:, 1]
+        shared = present[first] & present[second]
+        differences = np.abs(values[first] - values[second])
+        # Entities a pair does not share rank below every real difference
+        ranked = np.where(shared, differences, -1.0)
+        
+        # Top 5 divergent entities per pair by magnitude, without sorting the rest
+        top_count = min(5, len(entity_ids))
+        top = np.argpartition(-ranked, top_count - 1, axis=1)[:, :top_count]
+        order = np.argsort(-np.take_along_axis(ranked, top, axis=1), axis=1, kind='stable')
+        top = np.take_along_axis(top, order, axis=1)
+        top_shared = np.take_along_axis(shared, top, axis=1)
+        
+        entity_names = self._get_entity_names(sorted({entity_ids[j] for j in top[top_shared]}))
+        
+        pair_entities = []
+        for p in range(len(pair_rows)):
+            entities = []
+            for j in top[p][top_shared[p]]:
+                entity_id = entity_ids[j]
+                entities.append({
                     'entity_id': entity_id,
-                    'entity_name': entity_name,
-                    'sentiment_difference': sentiment_diff,
-                    'source1_sentiment': vector1[entity_id],
-                    'source2_sentiment': vector2[entity_id]
+                    'entity_name': entity_names.get(entity_id, f"Entity {entity_id}"),
+                    'sentiment_difference': float(differences[p, j]),
+                    'source1_sentiment': float(values[first[p], j]),
+                    'source2_sentiment': float(values[second[p], j])
                 })
+            pair_entities.append(entities)
         
-        # Sort by divergence magnitude and return top entities
-        divergent_entities.sort(key=lambda x: x['sentiment_difference'], reverse=True)
-        return divergent_entities[:5]  # Top 5 divergent entities
+        return pair_entities
+    
+    def _get_entity_names(self, entity_ids: List[int]) -> Dict[int, str]:
+        """Get display names for several entities in one query."""
+        stmt = select(Entity.id, Entity.name).where(Entity.id.in_(entity_ids))
+        return {entity_id: name for entity_id, name in self.session.execute(stmt)}
     
     def _create_divergence_finding(self,
                                  source1_id: int,
@@ -373,12 +765,12 @@ class SourceDivergenceDetector(BaseIntelligenceAnalyzer):
                                  p_value: float,
                                  divergent_entities: List[Dict[str, Any]],
                                  event_start: datetime,
-                                 event_end: datetime) -> int:
+                                 event_end: datetime) -> Dict[str, Any]:
         """
         Create a divergence finding for the dashboard.
         
         Returns:
-            Finding ID
+            Finding record for store_findings()
         """
         # Create title and description
         title = f"Editorial Divergence: {source1_name} vs {source2_name}"
@@ -409,8 +801,8 @@ class SourceDivergenceDetector(BaseIntelligenceAnalyzer):
             }
         }
         
-        # Store finding
-        finding_id = self.store_finding(
+        # Build the finding record; stored in bulk by the caller
+        return self.build_finding(
             finding_type='source_divergence',
             title=title,
             description=description,
@@ -424,6 +816,4 @@ class SourceDivergenceDetector(BaseIntelligenceAnalyzer):
             event_end_date=event_end,
             change_magnitude=divergence_magnitude,
             supporting_data=supporting_data
-        )
-        
-        return finding_id
\ No newline at end of file
+        )
\ No newline at end of file
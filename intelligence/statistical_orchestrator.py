@@ -13,6 +13,9 @@ import os
 import sys
 import time
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional
@@ -26,6 +29,8 @@ from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.exc import SQLAlchemyError
 
+from database.config import DatabaseConfig
+
 # Import statistical and clustering modules
 try:
     from intelligence.sentiment_anomaly_detector import SentimentAnomalyDetector
@@ -77,6 +82,37 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# One pooled engine per database URL, shared by every orchestrator in the process
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(database_url: str):
+    """
+    Get the shared pooled engine for a database URL, creating it on first use.
+    
+    Args:
+        database_url: Database connection string
+        
+    Returns:
+        SQLAlchemy engine
+    """
+    with _engines_lock:
+        engine = _engines.get(database_url)
+        if engine is None:
+            engine = create_engine(
+                database_url,
+                pool_size=DatabaseConfig.POOL_SIZE,
+                max_overflow=DatabaseConfig.MAX_OVERFLOW,
+                pool_timeout=DatabaseConfig.POOL_TIMEOUT,
+                pool_recycle=DatabaseConfig.POOL_RECYCLE,
+                pool_pre_ping=True,  # Drop connections the server closed while idle
+                pool_use_lifo=True   # Reuse the warmest connection, let extras time out
+            )
+            _engines[database_url] = engine
+        return engine
+
+
 class StatisticalOrchestrator:
     """Orchestrates all statistical and clustering analysis with proper throttling."""
     
@@ -92,9 +128,8 @@ class StatisticalOrchestrator:
         
         # Initialize database connection
         try:
-            self.engine = create_engine(self.database_url)
+            self.engine = get_engine(self.database_url)
             self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
-            self.session = self.SessionLocal()
             logger.info("Database connection established")
         except Exception as e:
             logger.error(f"Failed to connect to database: {e}")
@@ -109,17 +144,18 @@ class StatisticalOrchestrator:
             except Exception as e:
                 logger.warning(f"Could not connect to statistical database: {e}")
         
-        # Initialize analysis modules
+        # Initialize analysis modules. Analyzers hold no session between runs;
+        # each run binds a fresh one (see _analyzer_session).
         self.intelligence_analyzers = {}
         self.clustering_analyzers = {}
         
         if has_intelligence and self.statistical_db:
             try:
                 self.intelligence_analyzers = {
-                    'sentiment_anomaly': SentimentAnomalyDetector(self.session, self.statistical_db),
-                    'source_divergence': SourceDivergenceDetector(self.session, self.statistical_db),
-                    'polarization': PolarizationDetector(self.session, self.statistical_db),
-                    'clustering_insights': ClusteringInsightsAnalyzer(self.session, self.statistical_db)
+                    'sentiment_anomaly': SentimentAnomalyDetector(None, self.statistical_db),
+                    'source_divergence': SourceDivergenceDetector(None, self.statistical_db),
+                    'polarization': PolarizationDetector(None, self.statistical_db),
+                    'clustering_insights': ClusteringInsightsAnalyzer(None, self.statistical_db)
                 }
                 logger.info(f"Initialized {len(self.intelligence_analyzers)} intelligence analyzers")
             except Exception as e:
@@ -128,14 +164,95 @@ class StatisticalOrchestrator:
         
         if has_clustering:
             self.clustering_analyzers = {
-                'cluster_manager': ClusterManager(self.session),
-                'temporal_analyzer': TemporalAnalyzer(self.session)
+                'cluster_manager': ClusterManager(None),
+                'temporal_analyzer': TemporalAnalyzer(None)
             }
             logger.info(f"Initialized {len(self.clustering_analyzers)} clustering analyzers")
         
+        # Resolve each analyzer's entry point once, in order of preference
+        self._intelligence_methods = self._resolve_analysis_methods(
+            self.intelligence_analyzers, ('analyze', 'run_analysis')
+        )
+        self._clustering_methods = self._resolve_analysis_methods(
+            self.clustering_analyzers,
+            ('analyze', 'cluster_all_countries', 'analyze_temporal_patterns', 'run_analysis')
+        )
+        
         # Throttling configuration
         self.intelligence_throttle_hours = 24  # Run intelligence functions max once per day
         self.clustering_throttle_hours = 168  # Run clustering functions max once per week (7 days)
+        
+        # Last run times fetched in bulk by load_last_run_times()
+        self._last_run_cache = {}
+    
+    def _resolve_analysis_methods(self, analyzers: Dict, method_names: tuple) -> Dict:
+        """
+        Map each analyzer name to its first available analysis method.
+        
+        Args:
+            analyzers: Analyzer name -> analyzer
+            method_names: Candidate method names, in order of preference
+            
+        Returns:
+            Dictionary of analyzer name -> bound method, or None if it has none
+        """
+        methods = {}
+        for name, analyzer in analyzers.items():
+            methods[name] = next(
+                (getattr(analyzer, method_name) for method_name in method_names if hasattr(analyzer, method_name)),
+                None
+            )
+            if methods[name] is None:
+                logger.warning(f"No analysis method found for {name}")
+        return methods
+    
+    @contextmanager
+    def _analyzer_session(self, analyzer):
+        """
+        Bind a fresh session to an analyzer for the duration of one run.
+        
+        Closing the session afterwards returns its connection to the pool and
+        drops its identity map, so objects loaded by one analyzer are not kept
+        alive while the next one runs.
+        """
+        with self.SessionLocal() as session:
+            analyzer.session = session
+            try:
+                yield session
+            finally:
+                analyzer.session = None
+    
+    def load_last_run_times(self, analysis_types: List[str]):
+        """
+        Fetch the last run times of several analysis types in one query.
+        
+        Later get_last_run_time() calls for these types are answered from
+        the cache instead of querying the statistical database one by one.
+        
+        Args:
+            analysis_types: Types of analysis to fetch
+        """
+        if not self.statistical_db:
+            return
+        
+        try:
+            states = self.statistical_db.get_analysis_states(analysis_types)
+        except Exception as e:
+            logger.warning(f"Could not get last run times for {analysis_types}: {e}")
+            return
+        
+        for analysis_type in analysis_types:
+            self._last_run_cache[analysis_type] = self._last_run_from_state(states.get(analysis_type))
+    
+    def _last_run_from_state(self, result: Optional[Dict]) -> Optional[datetime]:
+        """Extract the last run time from an analysis state, if any."""
+        if result and result.get('state_data'):
+            state_data = result['state_data']
+            if isinstance(state_data, dict) and state_data.get('last_run_timestamp'):
+                return datetime.fromisoformat(state_data['last_run_timestamp'])
+            elif result.get('last_updated'):
+                return result['last_updated']
+        return None
     
     def get_last_run_time(self, analysis_type: str) -> Optional[datetime]:
         """
@@ -150,14 +267,11 @@ class StatisticalOrchestrator:
         if not self.statistical_db:
             return None
         
+        if analysis_type in self._last_run_cache:
+            return self._last_run_cache[analysis_type]
+        
         try:
-            result = self.statistical_db.get_analysis_state(analysis_type)
-            if result and result.get('state_data'):
-                state_data = result['state_data']
-                if isinstance(state_data, dict) and state_data.get('last_run_timestamp'):
-                    return datetime.fromisoformat(state_data['last_run_timestamp'])
-                elif result.get('last_updated'):
-                    return result['last_updated']
+            return self._last_run_from_state(self.statistical_db.get_analysis_state(analysis_type))
         except Exception as e:
             logger.warning(f"Could not get last run time for {analysis_type}: {e}")
         
@@ -171,28 +285,44 @@ class StatisticalOrchestrator:
             analysis_type: Type of analysis
             timestamp: Timestamp to set (defaults to now)
         """
-        if not self.statistical_db:
+        self.set_last_run_times([analysis_type], timestamp)
+    
+    def set_last_run_times(self, analysis_types: List[str], timestamp: datetime = None):
+        """
+        Set the last run time for several analysis types in one write.
+        
+        Args:
+            analysis_types: Types of analysis
+            timestamp: Timestamp to set (defaults to now)
+        """
+        if not self.statistical_db or not analysis_types:
             return
         
         timestamp = timestamp or datetime.now()
         
         try:
-            self.statistical_db.store_analysis_state(
-                analysis_type=analysis_type,
-                time_window_start=timestamp,
-                time_window_end=timestamp,
-                state_data={'status': 'completed', 'last_run_timestamp': timestamp.isoformat()}
-            )
+            self.statistical_db.store_analysis_states_bulk([
+                {
+                    'analysis_type': analysis_type,
+                    'time_window_start': timestamp,
+                    'time_window_end': timestamp,
+                    'state_data': {'status': 'completed', 'last_run_timestamp': timestamp.isoformat()}
+                }
+                for analysis_type in analysis_types
+            ])
+            for analysis_type in analysis_types:
+                self._last_run_cache[analysis_type] = timestamp
         except Exception as e:
-            logger.warning(f"Could not set last run time for {analysis_type}: {e}")
+            logger.warning(f"Could not set last run time for {analysis_types}: {e}")
     
-    def should_run_analysis(self, analysis_type: str, throttle_hours: int) -> bool:
+    def should_run_analysis(self, analysis_type: str, throttle_hours: int, now: datetime = None) -> bool:
         """
         Check if an analysis should run based on throttling rules.
         
         Args:
             analysis_type: Type of analysis
             throttle_hours: Minimum hours between runs
+            now: Current time (defaults to now)
             
         Returns:
             True if analysis should run
@@ -203,7 +333,7 @@ class StatisticalOrchestrator:
             logger.info(f"{analysis_type} has never run - will execute")
             return True
         
-        time_since_last_run = datetime.now() - last_run
+        time_since_last_run = (now or datetime.now()) - last_run
         time_since_hours = time_since_last_run.total_seconds() / 3600
         
         if time_since_hours >= throttle_hours:
@@ -231,37 +361,62 @@ class StatisticalOrchestrator:
         
         logger.info("Running intelligence analysis...")
         
-        for name, analyzer in self.intelligence_analyzers.items():
-            try:
-                if force or self.should_run_analysis(name, self.intelligence_throttle_hours):
-                    logger.info(f"Running {name} analysis...")
-                    start_time = time.time()
-                    
-                    # Run the analysis
-                    if hasattr(analyzer, 'analyze'):
-                        analyzer.analyze()
-                    elif hasattr(analyzer, 'run_analysis'):
-                        analyzer.run_analysis()
-                    else:
-                        logger.warning(f"No analysis method found for {name}")
-                        results[name] = False
-                        continue
-                    
-                    # Mark as completed
-                    self.set_last_run_time(name)
-                    
-                    execution_time = time.time() - start_time
-                    logger.info(f"Completed {name} analysis in {execution_time:.2f} seconds")
-                    results[name] = True
-                else:
-                    results[name] = False  # Throttled
-                    
-            except Exception as e:
-                logger.error(f"Error running {name} analysis: {e}")
-                results[name] = False
+        if not force:
+            self.load_last_run_times(list(self.intelligence_analyzers))
+        
+        # One timestamp for the whole run, used for throttling and recorded as the run time
+        run_start = datetime.now()
+        due = []
+        for name in self.intelligence_analyzers:
+            results[name] = False  # Throttled unless it runs below
+            if force or self.should_run_analysis(name, self.intelligence_throttle_hours, run_start):
+                due.append(name)
+        
+        if due:
+            # The analyzers read independent aggregates and mostly wait on the
+            # database, so run them concurrently, each with its own session
+            with ThreadPoolExecutor(max_workers=len(due), thread_name_prefix='intelligence') as executor:
+                futures = {name: executor.submit(self._run_intelligence_analyzer, name) for name in due}
+            for name, future in futures.items():
+                results[name] = future.result()
+        
+        # Mark every completed analysis in one write
+        self.set_last_run_times([name for name in due if results[name]], run_start)
         
         return results
     
+    def _run_intelligence_analyzer(self, name: str) -> bool:
+        """
+        Run one intelligence analyzer.
+        
+        Args:
+            name: Analyzer name in self.intelligence_analyzers
+            
+        Returns:
+            True if the analysis completed
+        """
+        analyzer = self.intelligence_analyzers[name]
+        try:
+            logger.info(f"Running {name} analysis...")
+            start_time = time.time()
+            
+            # Run the analysis
+            method = self._intelligence_methods[name]
+            if method is None:
+                logger.warning(f"No analysis method found for {name}")
+                return False
+            
+            with self._analyzer_session(analyzer):
+                method()
+            
+            execution_time = time.time() - start_time
+            logger.info(f"Completed {name} analysis in {execution_time:.2f} seconds")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error running {name} analysis: {e}")
+            return False
+    
     def run_clustering_analysis(self, force: bool = False) -> Dict[str, bool]:
         """
         Run all clustering analysis functions with throttling.
@@ -280,30 +435,26 @@ class StatisticalOrchestrator:
         
         logger.info("Running clustering analysis...")
         
+        if not force:
+            self.load_last_run_times(list(self.clustering_analyzers))
+        
+        # One timestamp for the whole run, used for throttling and recorded as the run time
+        run_start = datetime.now()
         for name, analyzer in self.clustering_analyzers.items():
             try:
-                if force or self.should_run_analysis(name, self.clustering_throttle_hours):
+                if force or self.should_run_analysis(name, self.clustering_throttle_hours, run_start):
                     logger.info(f"Running {name} analysis...")
                     start_time = time.time()
                     
                     # Run the analysis
-                    if hasattr(analyzer, 'analyze'):
-                        analyzer.analyze()
-                    elif hasattr(analyzer, 'cluster_all_countries'):
-                        # For cluster manager
-                        analyzer.cluster_all_countries()
-                    elif hasattr(analyzer, 'analyze_temporal_patterns'):
-                        # For temporal analyzer
-                        analyzer.analyze_temporal_patterns()
-                    elif hasattr(analyzer, 'run_analysis'):
-                        analyzer.run_analysis()
-                    else:
+                    method = self._clustering_methods[name]
+                    if method is None:
                         logger.warning(f"No analysis method found for {name}")
                         results[name] = False
                         continue
                     
-                    # Mark as completed
-                    self.set_last_run_time(name)
+                    with self._analyzer_session(analyzer):
+                        method()
                     
                     execution_time = time.time() - start_time
                     logger.info(f"Completed {name} analysis in {execution_time:.2f} seconds")
@@ -315,6 +466,9 @@ class StatisticalOrchestrator:
                 logger.error(f"Error running {name} analysis: {e}")
                 results[name] = False
         
+        # Mark every completed analysis in one write
+        self.set_last_run_times([name for name, success in results.items() if success], run_start)
+        
         return results
     
     def run_all_analysis(self, force: bool = False) -> Dict[str, Dict[str, bool]]:
@@ -334,8 +488,9 @@ class StatisticalOrchestrator:
         if has_entity_pruning:
             try:
                 logger.info("Running entity pruning before statistical analysis...")
-                get_pruning_stats(self.session)
-                pruned_count = prune_low_activity_entities(self.session, dry_run=False)
+                with self.SessionLocal() as session:
+                    get_pruning_stats(session)
+                    pruned_count = prune_low_activity_entities(session, dry_run=False)
                 logger.info(f"Pruned {pruned_count} low-activity entities")
             except Exception as e:
                 logger.error(f"Error during entity pruning: {e}")
@@ -382,7 +537,7 @@ class StatisticalOrchestrator:
     def status(self) -> Dict[str, any]:
         """Get status of all analysis modules."""
         status_info = {
-            'database_connected': bool(self.session),
+            'database_connected': self.engine is not None,
             'statistical_db_available': bool(self.statistical_db),
             'intelligence_modules': len(self.intelligence_analyzers),
             'clustering_modules': len(self.clustering_analyzers),
@@ -391,19 +546,16 @@ class StatisticalOrchestrator:
         
         # Get last run times for all modules
         all_modules = list(self.intelligence_analyzers.keys()) + list(self.clustering_analyzers.keys())
+        self.load_last_run_times(all_modules)
+        now = datetime.now()
         for module_name in all_modules:
             last_run = self.get_last_run_time(module_name)
             status_info['last_run_times'][module_name] = {
                 'last_run': last_run.isoformat() if last_run else None,
-                'hours_since_last_run': (datetime.now() - last_run).total_seconds() / 3600 if last_run else None
+                'hours_since_last_run': (now - last_run).total_seconds() / 3600 if last_run else None
             }
         
         return status_info
-    
-    def __del__(self):
-        """Clean up database connections."""
-        if hasattr(self, 'session') and self.session:
-            self.session.close()
 
 
 def main():
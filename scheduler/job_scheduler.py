@@ -13,11 +13,13 @@ Coordinates the timing of:
 import os
 import sys
 import logging
-import time
+import multiprocessing
+import threading
 from datetime import datetime, timedelta
 import schedule
 import signal
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Setup paths
@@ -25,6 +27,7 @@ ROOT_DIR = Path(__file__).parent.parent
 sys.path.append(str(ROOT_DIR))
 
 from database.models import get_db_connection
+from sqlalchemy import text
 from sqlalchemy.orm import sessionmaker
 from clustering.source_similarity import SourceSimilarityComputer
 from clustering.cluster_manager import ClusterManager
@@ -45,38 +48,97 @@ logging.basicConfig(
 )
 logger = logging.getLogger("scheduler")
 
-# Global flag for graceful shutdown
-shutdown_requested = False
+# Set on shutdown; also wakes the main loop from its idle wait
+shutdown_requested = threading.Event()
+
+# Longest the main loop sleeps between checks for due jobs
+MAX_IDLE_SECONDS = 300
+
+SCRAPER_TIMEOUT_SECONDS = 3600  # 1 hour
+MAINTENANCE_WORKERS = 4  # Tables vacuumed at once
+ANALYSIS_JOB_TIMEOUT_SECONDS = 6 * 3600  # Similarity and clustering jobs
+SCRAPER_OUTPUT_FILE = LOG_DIR / "scraper.out"
+TERMINATE_GRACE_SECONDS = 30  # Wait after SIGTERM before SIGKILL
+
+
+def _scraper_child():
+    """Scraper process entry point; sends its console output to the scraper log file."""
+    from scrapers.scrape_to_db import run_scraper_with_db
+    
+    # The fork inherits the scheduler's shutdown handlers, which would turn
+    # terminate() into a no-op; restore the defaults so SIGTERM kills the child
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    
+    # Point the process's stdout/stderr at the log file, so the scraper's very
+    # chatty output goes straight to disk instead of the scheduler's console
+    with open(SCRAPER_OUTPUT_FILE, 'ab') as output:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(output.fileno(), 1)
+        os.dup2(output.fileno(), 2)
+    
+    # Log to the redirected stderr only, as the scraper does when run on its
+    # own, rather than through the inherited scheduler.log handler
+    root_logger = logging.getLogger()
+    root_logger.handlers = [logging.StreamHandler()]
+    root_logger.handlers[0].setFormatter(
+        logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    )
+    run_scraper_with_db()
+
+
+def _scraper_output_tail(size: int = 4096) -> str:
+    """Get the end of the scraper log file for error reports."""
+    try:
+        with open(SCRAPER_OUTPUT_FILE, 'rb') as output:
+            output.seek(0, os.SEEK_END)
+            output.seek(max(0, output.tell() - size))
+            return output.read().decode('utf-8', errors='replace')
+    except OSError:
+        return ''
+
+
+def _stop_process(process: multiprocessing.Process):
+    """Terminate a child process, killing it if it ignores SIGTERM."""
+    process.terminate()
+    process.join(TERMINATE_GRACE_SECONDS)
+    if process.is_alive():
+        process.kill()
+        process.join()
 
 
 def signal_handler(sig, frame):
     """Handle shutdown signals gracefully."""
-    global shutdown_requested
     logger.info("Shutdown signal received. Finishing current jobs...")
-    shutdown_requested = True
+    shutdown_requested.set()
 
 
 def run_scraper():
     """Run the news scraper."""
     logger.info("Starting news scraper job")
     try:
-        # Run scraper with timeout
-        result = subprocess.run(
-            ["python", "-m", "scrapers.scrape_to_db"],
-            cwd=ROOT_DIR,
-            capture_output=True,
-            text=True,
-            timeout=3600  # 1 hour timeout
+        # Imported here so the scraper's logging setup does not replace ours
+        import scrapers.scrape_to_db  # noqa: F401
+        
+        # Fork the scraper rather than starting a fresh interpreter: the child
+        # inherits the already imported modules, but still runs in its own
+        # process so it can be killed on timeout and its memory is returned
+        process = multiprocessing.get_context('fork').Process(
+            target=_scraper_child, name='scraper'
         )
+        process.start()
+        process.join(SCRAPER_TIMEOUT_SECONDS)
         
-        if result.returncode == 0:
+        if process.is_alive():
+            _stop_process(process)
+            logger.error("Scraper timed out after 1 hour")
+        elif process.exitcode == 0:
             logger.info("Scraper completed successfully")
         else:
-            logger.error(f"Scraper failed with code {result.returncode}")
-            logger.error(f"Error output: {result.stderr}")
+            logger.error(f"Scraper failed with code {process.exitcode}")
+            logger.error(f"Error output: {_scraper_output_tail()}")
             
-    except subprocess.TimeoutExpired:
-        logger.error("Scraper timed out after 1 hour")
     except Exception as e:
         logger.error(f"Error running scraper: {e}")
 
@@ -116,10 +178,34 @@ def ensure_analyzer_running():
         logger.debug("Batch analyzer daemon is already running")
 
 
-def run_weekly_similarity():
-    """Run weekly similarity computation."""
-    logger.info("Starting weekly similarity computation")
+def _run_in_child(target, name: str) -> bool:
+    """
+    Run a job function in a fresh child process and wait for it.
+    
+    The child is started from a forkserver, so it builds its own database
+    engine instead of inheriting the scheduler's connections, and the memory
+    of large numeric jobs is returned to the system when it exits.
     
+    Args:
+        target: Module-level job function
+        name: Process name for logging
+        
+    Returns:
+        True if the job exited successfully
+    """
+    process = multiprocessing.get_context('forkserver').Process(target=target, name=name)
+    process.start()
+    process.join(ANALYSIS_JOB_TIMEOUT_SECONDS)
+    
+    if process.is_alive():
+        _stop_process(process)
+        logger.error(f"{name} timed out after {ANALYSIS_JOB_TIMEOUT_SECONDS // 3600} hours")
+        return False
+    return process.exitcode == 0
+
+
+def _weekly_similarity_child():
+    """Weekly similarity job body, run in a child process."""
     try:
         engine = get_db_connection()
         Session = sessionmaker(bind=engine)
@@ -134,16 +220,14 @@ def run_weekly_similarity():
         temporal_analyzer.compute_weekly_drift_metrics()
         
         session.close()
-        logger.info("Weekly similarity computation completed")
         
     except Exception as e:
         logger.error(f"Error in weekly similarity computation: {e}", exc_info=True)
+        sys.exit(1)
 
 
-def run_monthly_clustering():
-    """Run monthly clustering job."""
-    logger.info("Starting monthly clustering")
-    
+def _monthly_clustering_child():
+    """Monthly clustering job body, run in a child process."""
     try:
         engine = get_db_connection()
         Session = sessionmaker(bind=engine)
@@ -153,7 +237,35 @@ def run_monthly_clustering():
         cluster_manager.perform_monthly_clustering()
         
         session.close()
-        logger.info("Monthly clustering completed")
+        
+    except Exception as e:
+        logger.error(f"Error in monthly clustering: {e}", exc_info=True)
+        sys.exit(1)
+
+
+def run_weekly_similarity():
+    """Run weekly similarity computation."""
+    logger.info("Starting weekly similarity computation")
+    
+    try:
+        if _run_in_child(_weekly_similarity_child, 'weekly-similarity'):
+            logger.info("Weekly similarity computation completed")
+        else:
+            logger.error("Weekly similarity computation failed")
+        
+    except Exception as e:
+        logger.error(f"Error in weekly similarity computation: {e}", exc_info=True)
+
+
+def run_monthly_clustering():
+    """Run monthly clustering job."""
+    logger.info("Starting monthly clustering")
+    
+    try:
+        if _run_in_child(_monthly_clustering_child, 'monthly-clustering'):
+            logger.info("Monthly clustering completed")
+        else:
+            logger.error("Monthly clustering failed")
         
     except Exception as e:
         logger.error(f"Error in monthly clustering: {e}", exc_info=True)
@@ -177,18 +289,44 @@ def update_sentiment_statistics():
         logger.error(f"Error updating sentiment statistics: {e}", exc_info=True)
 
 
+def _vacuum_table(engine, table: str):
+    """VACUUM ANALYZE one table on its own autocommit connection."""
+    # VACUUM cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(f"VACUUM (ANALYZE, PARALLEL 2) {table}"))
+
+
 def database_maintenance():
     """Run database maintenance tasks."""
     logger.info("Starting database maintenance")
     
     try:
-        # Vacuum analyze for performance
+        # Vacuum analyze for performance, a few tables at a time
         engine = get_db_connection()
-        with engine.connect() as conn:
-            conn.execute("VACUUM ANALYZE")
-            conn.commit()
+        try:
+            # Only the application's own tables: TimescaleDB catalog and chunk
+            # tables live in other schemas, and hypertables vacuum their chunks
+            with engine.connect() as conn:
+                tables = conn.execute(text("""
+                    SELECT quote_ident(schemaname) || '.' || quote_ident(tablename)
+                    FROM pg_tables
+                    WHERE schemaname = current_schema() AND tableowner = current_user
+                """)).scalars().all()
+            
+            failed = 0
+            with ThreadPoolExecutor(max_workers=MAINTENANCE_WORKERS) as executor:
+                futures = {table: executor.submit(_vacuum_table, engine, table) for table in tables}
+                for table, future in futures.items():
+                    try:
+                        future.result()
+                    except Exception as e:
+                        failed += 1
+                        logger.error(f"Error vacuuming {table}: {e}")
+        finally:
+            # The daily job builds a fresh engine; don't leak its pool on errors
+            engine.dispose()
         
-        logger.info("Database maintenance completed")
+        logger.info(f"Database maintenance completed: vacuumed {len(tables) - failed}/{len(tables)} tables")
         
     except Exception as e:
         logger.error(f"Error in database maintenance: {e}", exc_info=True)
@@ -237,14 +375,20 @@ def main():
     run_scraper()
     
     # Main loop
-    while not shutdown_requested:
+    while not shutdown_requested.is_set():
         try:
             schedule.run_pending()
-            time.sleep(60)  # Check every minute
+            
+            # Sleep until the next job is due instead of polling every minute;
+            # a shutdown signal ends the wait early
+            idle_seconds = schedule.idle_seconds()
+            if idle_seconds is None:
+                idle_seconds = MAX_IDLE_SECONDS
+            shutdown_requested.wait(min(max(idle_seconds, 1), MAX_IDLE_SECONDS))
             
         except Exception as e:
             logger.error(f"Error in scheduler loop: {e}", exc_info=True)
-            time.sleep(300)  # Wait 5 minutes before retrying
+            shutdown_requested.wait(300)  # Wait 5 minutes before retrying
     
     logger.info("Scheduler shutdown complete")
 
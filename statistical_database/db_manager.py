@@ -8,13 +8,63 @@ Provides a clean interface for storing and retrieving statistical findings.
 import sqlite3
 import json
 import logging
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 from pathlib import Path
 from contextlib import contextmanager
 
 logger = logging.getLogger(__name__)
 
+# Tables added after the original schema. Idempotent, so they are applied to
+# existing databases on startup as well as created by schema.sql.
+SCHEMA_UPGRADES = (
+    """
+    CREATE TABLE IF NOT EXISTS entity_weekly_sentiment (
+        entity_id INTEGER NOT NULL,
+        week_start DATE NOT NULL,
+        sum_value REAL NOT NULL,
+        sum_squares REAL NOT NULL,
+        sample_count INTEGER NOT NULL,
+        min_value REAL,
+        max_value REAL,
+        last_updated DATETIME DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (entity_id, week_start)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_entity_weekly_sentiment_week ON entity_weekly_sentiment(week_start)",
+    """
+    CREATE TABLE IF NOT EXISTS entity_daily_sentiment (
+        entity_id INTEGER NOT NULL,
+        day DATE NOT NULL,
+        sum_value REAL NOT NULL,
+        sample_count INTEGER NOT NULL,
+        last_updated DATETIME DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (entity_id, day)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_entity_daily_sentiment_day ON entity_daily_sentiment(day)",
+    """
+    CREATE TABLE IF NOT EXISTS source_entity_weekly_sentiment (
+        source_id INTEGER NOT NULL,
+        entity_id INTEGER NOT NULL,
+        week_start DATE NOT NULL,
+        sum_value REAL NOT NULL,
+        sample_count INTEGER NOT NULL,
+        PRIMARY KEY (entity_id, week_start, source_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS source_entity_weekly_coverage (
+        entity_id INTEGER NOT NULL,
+        week_start DATE NOT NULL,
+        last_updated DATETIME DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (entity_id, week_start)
+    )
+    """,
+    # Latest-state lookups: equality on type and scope, then MAX(last_updated)
+    "CREATE INDEX IF NOT EXISTS idx_analysis_state_latest ON analysis_state(analysis_type, entity_id, source_id, last_updated)",
+)
+
 class StatisticalDBManager:
     """Manager for the SQLite statistical database."""
     
@@ -45,11 +95,28 @@ class StatisticalDBManager:
                     schema_sql = f.read()
                 conn.executescript(schema_sql)
                 logger.info("Database initialized successfully")
+            else:
+                for statement in SCHEMA_UPGRADES:
+                    conn.execute(statement)
+                self._drop_baseline_percentiles(conn)
+                conn.commit()
+    
+    def _drop_baseline_percentiles(self, conn: sqlite3.Connection):
+        """Drop the unused baseline_statistics percentile columns from older databases."""
+        # DROP COLUMN needs SQLite 3.35; older libraries just keep the NULL columns
+        if sqlite3.sqlite_version_info < (3, 35, 0):
+            return
+        
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(baseline_statistics)")}
+        for column in ('percentile_95', 'percentile_5'):
+            if column in columns:
+                conn.execute(f"ALTER TABLE baseline_statistics DROP COLUMN {column}")
     
     @contextmanager
     def get_connection(self):
         """Get a database connection with automatic cleanup."""
-        conn = sqlite3.connect(self.db_path)
+        # Analyzers may write concurrently; wait for the write lock instead of failing
+        conn = sqlite3.connect(self.db_path, timeout=30)
         conn.row_factory = sqlite3.Row  # Enable dict-like access
         try:
             yield conn
@@ -81,6 +148,34 @@ class StatisticalDBManager:
             ))
             conn.commit()
     
+    def store_analysis_states_bulk(self, states: List[Dict[str, Any]]):
+        """
+        Store several analysis states in one transaction.
+        
+        Each dictionary has analysis_type, time_window_start, time_window_end
+        and state_data, plus optional entity_id, source_id and metadata, as
+        taken by store_analysis_state().
+        """
+        if not states:
+            return
+        
+        now = datetime.utcnow()
+        with self.get_connection() as conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO analysis_state (
+                    analysis_type, entity_id, source_id, 
+                    time_window_start, time_window_end, 
+                    state_data, metadata, last_updated
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, [(
+                state['analysis_type'], state.get('entity_id'), state.get('source_id'),
+                state['time_window_start'], state['time_window_end'],
+                json.dumps(state['state_data']),
+                json.dumps(state['metadata']) if state.get('metadata') else None,
+                now
+            ) for state in states])
+            conn.commit()
+    
     def get_analysis_state(self, 
                           analysis_type: str,
                           entity_id: Optional[int] = None,
@@ -90,25 +185,61 @@ class StatisticalDBManager:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT * FROM analysis_state 
-                WHERE analysis_type = ? AND entity_id = ? AND source_id = ?
+                WHERE analysis_type = ? AND entity_id IS ? AND source_id IS ?
                 ORDER BY last_updated DESC LIMIT 1
             """, (analysis_type, entity_id, source_id))
             
             row = cursor.fetchone()
             if row:
-                return {
-                    'id': row['id'],
-                    'analysis_type': row['analysis_type'],
-                    'entity_id': row['entity_id'],
-                    'source_id': row['source_id'],
-                    'time_window_start': datetime.fromisoformat(row['time_window_start']),
-                    'time_window_end': datetime.fromisoformat(row['time_window_end']),
-                    'state_data': json.loads(row['state_data']),
-                    'metadata': json.loads(row['metadata']) if row['metadata'] else None,
-                    'last_updated': datetime.fromisoformat(row['last_updated'])
-                }
+                return self._analysis_state_from_row(row)
             return None
     
+    def get_analysis_states(self, analysis_types: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the latest global analysis state for several types in one query.
+        
+        Args:
+            analysis_types: Analysis types to look up
+            
+        Returns:
+            Dictionary mapping analysis_type -> state, for types that have one
+        """
+        if not analysis_types:
+            return {}
+        
+        placeholders = ','.join('?' * len(analysis_types))
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT s.* FROM analysis_state s
+                WHERE s.analysis_type IN ({placeholders})
+                AND s.entity_id IS NULL AND s.source_id IS NULL
+                AND s.last_updated = (
+                    SELECT MAX(last_updated) FROM analysis_state
+                    WHERE analysis_type = s.analysis_type
+                    AND entity_id IS NULL AND source_id IS NULL
+                )
+            """, analysis_types)
+            
+            return {
+                row['analysis_type']: self._analysis_state_from_row(row)
+                for row in cursor.fetchall()
+            }
+    
+    def _analysis_state_from_row(self, row: sqlite3.Row) -> Dict[str, Any]:
+        """Convert an analysis_state row to a dictionary."""
+        return {
+            'id': row['id'],
+            'analysis_type': row['analysis_type'],
+            'entity_id': row['entity_id'],
+            'source_id': row['source_id'],
+            'time_window_start': datetime.fromisoformat(row['time_window_start']),
+            'time_window_end': datetime.fromisoformat(row['time_window_end']),
+            'state_data': json.loads(row['state_data']),
+            'metadata': json.loads(row['metadata']) if row['metadata'] else None,
+            'last_updated': datetime.fromisoformat(row['last_updated'])
+        }
+    
     def store_statistical_finding(self,
                                 finding_type: str,
                                 title: str,
@@ -159,6 +290,50 @@ class StatisticalDBManager:
             conn.commit()
             return finding_id
     
+    def store_statistical_findings_bulk(self, findings: List[Dict[str, Any]]) -> List[int]:
+        """
+        Store several statistical findings in one transaction.
+        
+        Each dictionary takes the same keys as store_statistical_finding().
+        Returns the finding IDs in input order.
+        """
+        if not findings:
+            return []
+        
+        finding_ids = []
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            for f in findings:
+                confidence_interval = f.get('confidence_interval')
+                supporting_data = f.get('supporting_data')
+                
+                cursor.execute("""
+                    INSERT OR REPLACE INTO statistical_findings (
+                        finding_type, entity_id, source_id, source_id_2, cluster_id,
+                        p_value, z_score, effect_size, confidence_interval_low, confidence_interval_high,
+                        event_start_date, event_end_date, baseline_value, current_value,
+                        change_magnitude, consecutive_days, title, description, severity_score,
+                        priority_score, dashboard_category, supporting_data
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (
+                    f['finding_type'], f.get('entity_id'), f.get('source_id'),
+                    f.get('source_id_2'), f.get('cluster_id'),
+                    f['p_value'], f.get('z_score'), f.get('effect_size'),
+                    confidence_interval[0] if confidence_interval else None,
+                    confidence_interval[1] if confidence_interval else None,
+                    f['event_start_date'], f.get('event_end_date'),
+                    f['baseline_value'], f['current_value'],
+                    f.get('change_magnitude'), f.get('consecutive_days'),
+                    f['title'], f['description'], f['severity_score'],
+                    f.get('priority_score', 0.5), f['dashboard_category'],
+                    json.dumps(supporting_data) if supporting_data else None
+                ))
+                finding_ids.append(cursor.lastrowid)
+            
+            conn.commit()
+        return finding_ids
+    
     def get_active_findings(self, 
                            dashboard_category: Optional[str] = None,
                            limit: int = 20) -> List[Dict[str, Any]]:
@@ -238,8 +413,6 @@ class StatisticalDBManager:
                                 source_id: Optional[int] = None,
                                 country: Optional[str] = None,
                                 window_weeks: int = 12,
-                                percentile_95: Optional[float] = None,
-                                percentile_5: Optional[float] = None,
                                 trend_slope: Optional[float] = None,
                                 trend_r_squared: Optional[float] = None):
         """Store baseline statistics for anomaly detection."""
@@ -247,16 +420,43 @@ class StatisticalDBManager:
             conn.execute("""
                 INSERT OR REPLACE INTO baseline_statistics (
                     metric_type, entity_id, source_id, country, window_weeks,
-                    mean_value, std_dev, min_value, max_value, percentile_95, percentile_5,
+                    mean_value, std_dev, min_value, max_value,
                     trend_slope, trend_r_squared, data_start_date, data_end_date, sample_count
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (
                 metric_type, entity_id, source_id, country, window_weeks,
-                mean_value, std_dev, min_value, max_value, percentile_95, percentile_5,
+                mean_value, std_dev, min_value, max_value,
                 trend_slope, trend_r_squared, data_start_date, data_end_date, sample_count
             ))
             conn.commit()
     
+    def store_baseline_statistics_bulk(self, baselines: List[Dict[str, Any]]):
+        """
+        Store several baseline statistics rows in one transaction.
+        
+        Each dictionary takes the same keys as store_baseline_statistics().
+        """
+        if not baselines:
+            return
+        
+        rows = [(
+            b['metric_type'], b.get('entity_id'), b.get('source_id'), b.get('country'),
+            b.get('window_weeks', 12),
+            b['mean_value'], b['std_dev'], b['min_value'], b['max_value'],
+            b.get('trend_slope'), b.get('trend_r_squared'),
+            b['data_start_date'], b['data_end_date'], b['sample_count']
+        ) for b in baselines]
+        
+        with self.get_connection() as conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO baseline_statistics (
+                    metric_type, entity_id, source_id, country, window_weeks,
+                    mean_value, std_dev, min_value, max_value,
+                    trend_slope, trend_r_squared, data_start_date, data_end_date, sample_count
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            conn.commit()
+    
     def get_baseline_statistics(self,
                               metric_type: str,
                               entity_id: Optional[int] = None,
@@ -268,8 +468,8 @@ class StatisticalDBManager:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT * FROM baseline_statistics 
-                WHERE metric_type = ? AND entity_id = ? AND source_id = ? 
-                      AND country = ? AND window_weeks = ?
+                WHERE metric_type = ? AND entity_id IS ? AND source_id IS ? 
+                      AND country IS ? AND window_weeks = ?
                 ORDER BY calculation_date DESC LIMIT 1
             """, (metric_type, entity_id, source_id, country, window_weeks))
             
@@ -283,6 +483,225 @@ class StatisticalDBManager:
                 return result
             return None
     
+    def get_entity_weekly_sentiment(self,
+                                  first_week: date,
+                                  last_week: date) -> Dict[int, Dict[date, Dict[str, Any]]]:
+        """
+        Get cached weekly sentiment partial sums for a range of weeks.
+        
+        Returns:
+            Dictionary mapping entity_id -> {week_start: partial sums row}
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT entity_id, week_start, sum_value, sum_squares, sample_count,
+                       min_value, max_value
+                FROM entity_weekly_sentiment
+                WHERE week_start >= ? AND week_start <= ?
+            """, (first_week.isoformat(), last_week.isoformat()))
+            
+            partials = {}
+            for row in cursor.fetchall():
+                result = dict(row)
+                week_start = date.fromisoformat(result.pop('week_start'))
+                partials.setdefault(result.pop('entity_id'), {})[week_start] = result
+            return partials
+    
+    def store_entity_weekly_sentiment_bulk(self, partials: List[Dict[str, Any]]):
+        """
+        Store weekly sentiment partial sums in one transaction.
+        
+        Each dictionary has entity_id, week_start (date), sum_value,
+        sum_squares, sample_count, min_value and max_value.
+        """
+        if not partials:
+            return
+        
+        rows = [(
+            p['entity_id'], p['week_start'].isoformat(),
+            p['sum_value'], p['sum_squares'], p['sample_count'],
+            p['min_value'], p['max_value'], datetime.utcnow()
+        ) for p in partials]
+        
+        with self.get_connection() as conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO entity_weekly_sentiment (
+                    entity_id, week_start, sum_value, sum_squares, sample_count,
+                    min_value, max_value, last_updated
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            conn.commit()
+    
+    def prune_entity_weekly_sentiment(self, before_week: date) -> int:
+        """Delete weekly partial sums for weeks that left the baseline window."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                DELETE FROM entity_weekly_sentiment WHERE week_start < ?
+            """, (before_week.isoformat(),))
+            conn.commit()
+            return cursor.rowcount
+    
+    def get_entity_daily_sentiment(self,
+                                 first_day: date,
+                                 last_day: date) -> Dict[int, Dict[date, Tuple[float, int]]]:
+        """
+        Get cached daily sentiment sums for a range of days.
+        
+        Returns:
+            Dictionary mapping entity_id -> {day: (sum_value, sample_count)}
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT entity_id, day, sum_value, sample_count
+                FROM entity_daily_sentiment
+                WHERE day >= ? AND day <= ?
+            """, (first_day.isoformat(), last_day.isoformat()))
+            
+            sums = {}
+            for row in cursor.fetchall():
+                sums.setdefault(row['entity_id'], {})[date.fromisoformat(row['day'])] = (
+                    row['sum_value'], row['sample_count']
+                )
+            return sums
+    
+    def store_entity_daily_sentiment_bulk(self, sums: List[Dict[str, Any]]):
+        """
+        Store daily sentiment sums in one transaction.
+        
+        Each dictionary has entity_id, day (date), sum_value and sample_count.
+        """
+        if not sums:
+            return
+        
+        rows = [(
+            s['entity_id'], s['day'].isoformat(), s['sum_value'], s['sample_count'],
+            datetime.utcnow()
+        ) for s in sums]
+        
+        with self.get_connection() as conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO entity_daily_sentiment (
+                    entity_id, day, sum_value, sample_count, last_updated
+                ) VALUES (?, ?, ?, ?, ?)
+            """, rows)
+            conn.commit()
+    
+    def prune_entity_daily_sentiment(self, before_day: date, after_day: Optional[date] = None) -> int:
+        """
+        Delete daily sentiment sums older than before_day.
+        
+        If after_day is given, sums for days after it are deleted too, so
+        days that were cached before they settled get re-aggregated.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            if after_day is None:
+                cursor.execute("""
+                    DELETE FROM entity_daily_sentiment WHERE day < ?
+                """, (before_day.isoformat(),))
+            else:
+                cursor.execute("""
+                    DELETE FROM entity_daily_sentiment WHERE day < ? OR day > ?
+                """, (before_day.isoformat(), after_day.isoformat()))
+            conn.commit()
+            return cursor.rowcount
+    
+    def get_source_entity_weekly_coverage(self,
+                                        first_week: date,
+                                        last_week: date) -> Dict[int, set]:
+        """
+        Get which (entity, week) pairs have cached per-source sentiment sums.
+        
+        Returns:
+            Dictionary mapping entity_id -> set of covered week_start dates
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT entity_id, week_start FROM source_entity_weekly_coverage
+                WHERE week_start >= ? AND week_start <= ?
+            """, (first_week.isoformat(), last_week.isoformat()))
+            
+            coverage = {}
+            for row in cursor.fetchall():
+                coverage.setdefault(row['entity_id'], set()).add(date.fromisoformat(row['week_start']))
+            return coverage
+    
+    def get_source_entity_sentiment_totals(self,
+                                         entity_ids: List[int],
+                                         first_week: date,
+                                         last_week: date) -> List[Tuple[int, int, float, int]]:
+        """
+        Sum cached weekly per-source sentiment over a range of weeks.
+        
+        Returns:
+            List of (source_id, entity_id, sentiment sum, mention count) rows
+        """
+        if not entity_ids:
+            return []
+        
+        placeholders = ','.join('?' * len(entity_ids))
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT source_id, entity_id, SUM(sum_value), SUM(sample_count)
+                FROM source_entity_weekly_sentiment
+                WHERE entity_id IN ({placeholders}) AND week_start >= ? AND week_start <= ?
+                GROUP BY source_id, entity_id
+            """, (*entity_ids, first_week.isoformat(), last_week.isoformat()))
+            return [tuple(row) for row in cursor.fetchall()]
+    
+    def store_source_entity_weekly_sentiment_bulk(self,
+                                                sums: List[Dict[str, Any]],
+                                                covered: List[Tuple[int, date]]):
+        """
+        Store weekly per-source sentiment sums and mark their (entity, week) pairs covered.
+        
+        Each sums dictionary has source_id, entity_id, week_start (date),
+        sum_value and sample_count. Sums previously stored for the covered
+        pairs are replaced as a whole. All writes share one transaction.
+        """
+        if not covered:
+            return
+        
+        now = datetime.utcnow()
+        with self.get_connection() as conn:
+            conn.executemany("""
+                DELETE FROM source_entity_weekly_sentiment
+                WHERE entity_id = ? AND week_start = ?
+            """, [(entity_id, week_start.isoformat()) for entity_id, week_start in covered])
+            conn.executemany("""
+                INSERT OR REPLACE INTO source_entity_weekly_sentiment (
+                    source_id, entity_id, week_start, sum_value, sample_count
+                ) VALUES (?, ?, ?, ?, ?)
+            """, [(
+                s['source_id'], s['entity_id'], s['week_start'].isoformat(),
+                s['sum_value'], s['sample_count']
+            ) for s in sums])
+            conn.executemany("""
+                INSERT OR REPLACE INTO source_entity_weekly_coverage (
+                    entity_id, week_start, last_updated
+                ) VALUES (?, ?, ?)
+            """, [(entity_id, week_start.isoformat(), now) for entity_id, week_start in covered])
+            conn.commit()
+    
+    def prune_source_entity_weekly_sentiment(self, before_week: date) -> int:
+        """Delete weekly per-source sentiment sums for weeks older than before_week."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                DELETE FROM source_entity_weekly_sentiment WHERE week_start < ?
+            """, (before_week.isoformat(),))
+            deleted = cursor.rowcount
+            cursor.execute("""
+                DELETE FROM source_entity_weekly_coverage WHERE week_start < ?
+            """, (before_week.isoformat(),))
+            conn.commit()
+            return deleted
+    
     def store_source_divergence(self,
                               source_id_1: int,
                               source_id_2: int,
@@ -344,6 +763,53 @@ class StatisticalDBManager:
             
             conn.commit()
     
+    def store_source_divergences_bulk(self, divergences: List[Dict[str, Any]]):
+        """
+        Store several source divergence analyses in one transaction.
+        
+        Each dictionary takes the same keys as store_source_divergence().
+        Existing rows for the same pair and recent window are updated in place.
+        """
+        if not divergences:
+            return
+        
+        now = datetime.utcnow()
+        rows = []
+        for d in divergences:
+            is_significant = d.get('is_significant')
+            if is_significant is None:
+                is_significant = d['divergence_p_value'] < 0.01
+            rows.append((
+                d['source_id_1'], d['source_id_2'], d['historical_correlation'],
+                d['historical_window_start'], d['historical_window_end'],
+                d['recent_correlation'], d['recent_window_start'], d['recent_window_end'],
+                d['divergence_p_value'], d['divergence_magnitude'],
+                json.dumps(d['top_divergent_entities']), is_significant, now
+            ))
+        
+        with self.get_connection() as conn:
+            conn.executemany("""
+                INSERT INTO source_divergence_tracking (
+                    source_id_1, source_id_2, historical_correlation,
+                    historical_window_start, historical_window_end,
+                    recent_correlation, recent_window_start, recent_window_end,
+                    divergence_p_value, divergence_magnitude, top_divergent_entities,
+                    is_significant, last_updated
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(source_id_1, source_id_2, recent_window_start) DO UPDATE SET
+                    historical_correlation = excluded.historical_correlation,
+                    historical_window_start = excluded.historical_window_start,
+                    historical_window_end = excluded.historical_window_end,
+                    recent_correlation = excluded.recent_correlation,
+                    recent_window_end = excluded.recent_window_end,
+                    divergence_p_value = excluded.divergence_p_value,
+                    divergence_magnitude = excluded.divergence_magnitude,
+                    top_divergent_entities = excluded.top_divergent_entities,
+                    is_significant = excluded.is_significant,
+                    last_updated = excluded.last_updated
+            """, rows)
+            conn.commit()
+    
     def get_significant_divergences(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get the most significant source divergences."""
         with self.get_connection() as conn:
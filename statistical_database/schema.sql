@@ -96,8 +96,6 @@ CREATE TABLE baseline_statistics (
     std_dev REAL NOT NULL,
     min_value REAL NOT NULL,
     max_value REAL NOT NULL,
-    percentile_95 REAL,
-    percentile_5 REAL,
     
     -- Trend analysis
     trend_slope REAL, -- Linear trend coefficient
@@ -145,6 +143,7 @@ CREATE TABLE source_divergence_tracking (
 
 -- Create indexes for efficient querying
 CREATE INDEX idx_analysis_state_type_time ON analysis_state(analysis_type, time_window_start, time_window_end);
+CREATE INDEX idx_analysis_state_latest ON analysis_state(analysis_type, entity_id, source_id, last_updated);
 CREATE INDEX idx_findings_active_priority ON statistical_findings(is_active, priority_score DESC);
 CREATE INDEX idx_findings_type_date ON statistical_findings(finding_type, detection_date);
 CREATE INDEX idx_findings_entity ON statistical_findings(entity_id, detection_date);
@@ -160,4 +159,51 @@ CREATE TABLE IF NOT EXISTS system_metrics (
     metric_value INTEGER NOT NULL DEFAULT 0,
     last_updated DATETIME DEFAULT CURRENT_TIMESTAMP,
     metadata TEXT -- JSON blob for additional info
-);
\ No newline at end of file
+);
+
+-- Weekly sentiment partial sums per entity - lets rolling baselines be
+-- combined from cached weeks instead of rescanning every mention
+CREATE TABLE IF NOT EXISTS entity_weekly_sentiment (
+    entity_id INTEGER NOT NULL,
+    week_start DATE NOT NULL, -- Monday of the ISO week
+    sum_value REAL NOT NULL, -- Sum of mention sentiment
+    sum_squares REAL NOT NULL, -- Sum of squared mention sentiment
+    sample_count INTEGER NOT NULL,
+    min_value REAL, -- NULL when sample_count is 0
+    max_value REAL,
+    last_updated DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (entity_id, week_start)
+);
+CREATE INDEX IF NOT EXISTS idx_entity_weekly_sentiment_week ON entity_weekly_sentiment(week_start);
+
+-- Daily sentiment sums per entity - cached for completed days so streak
+-- checks read a handful of small rows instead of re-aggregating mentions
+CREATE TABLE IF NOT EXISTS entity_daily_sentiment (
+    entity_id INTEGER NOT NULL,
+    day DATE NOT NULL,
+    sum_value REAL NOT NULL, -- Sum of mention sentiment
+    sample_count INTEGER NOT NULL,
+    last_updated DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (entity_id, day)
+);
+CREATE INDEX IF NOT EXISTS idx_entity_daily_sentiment_day ON entity_daily_sentiment(day);
+
+-- Weekly sentiment sums per (source, entity) - lets the historical window of
+-- the source divergence analysis be assembled from cached weeks
+CREATE TABLE IF NOT EXISTS source_entity_weekly_sentiment (
+    source_id INTEGER NOT NULL,
+    entity_id INTEGER NOT NULL,
+    week_start DATE NOT NULL, -- Monday of the ISO week
+    sum_value REAL NOT NULL, -- Sum of mention sentiment
+    sample_count INTEGER NOT NULL,
+    PRIMARY KEY (entity_id, week_start, source_id)
+);
+
+-- (entity, week) pairs whose per-source sums have been aggregated for all
+-- sources, so a missing source row means the source had no mentions
+CREATE TABLE IF NOT EXISTS source_entity_weekly_coverage (
+    entity_id INTEGER NOT NULL,
+    week_start DATE NOT NULL,
+    last_updated DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (entity_id, week_start)
+);
@@ -0,0 +1,69 @@
+"""
+Tests for the source divergence detector's weekly sentiment cache.
+"""
+
+from datetime import date, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from intelligence.source_divergence_detector import REFRESHED_HISTORICAL_WEEKS, SourceDivergenceDetector
+
+ENTITY_IDS = [11, 12, 13]
+WEEK_STARTS = [date(2026, 5, 4) + timedelta(weeks=i) for i in range(24)]
+SETTLED_WEEKS = WEEK_STARTS[:-REFRESHED_HISTORICAL_WEEKS]
+RECENT_WEEKS = WEEK_STARTS[-REFRESHED_HISTORICAL_WEEKS:]
+
+
+@pytest.fixture
+def detector():
+    # The cache logic only talks to the statistical database and the
+    # aggregation query, so skip __init__ and stub both
+    detector = SourceDivergenceDetector.__new__(SourceDivergenceDetector)
+    detector.statistical_db = MagicMock()
+    detector.statistical_db.get_source_entity_sentiment_totals.return_value = []
+    detector._calculate_source_weekly_sums = MagicMock(return_value=[])
+    return detector
+
+
+def _covered(detector):
+    (_, covered), _ = detector.statistical_db.store_source_entity_weekly_sentiment_bulk.call_args
+    return set(covered)
+
+
+def test_warm_cache_only_aggregates_refreshed_weeks(detector):
+    detector.statistical_db.get_source_entity_weekly_coverage.return_value = {
+        entity_id: set(WEEK_STARTS) for entity_id in ENTITY_IDS
+    }
+
+    detector._build_historical_sentiment_matrix([1, 2], ENTITY_IDS, WEEK_STARTS)
+
+    detector._calculate_source_weekly_sums.assert_called_once_with(ENTITY_IDS, RECENT_WEEKS)
+    assert _covered(detector) == {(e, w) for e in ENTITY_IDS for w in RECENT_WEEKS}
+
+
+def test_settled_gaps_only_aggregate_the_affected_entities(detector):
+    coverage = {entity_id: set(WEEK_STARTS) for entity_id in ENTITY_IDS}
+    coverage[12].discard(SETTLED_WEEKS[3])
+    detector.statistical_db.get_source_entity_weekly_coverage.return_value = coverage
+
+    detector._build_historical_sentiment_matrix([1, 2], ENTITY_IDS, WEEK_STARTS)
+
+    calls = detector._calculate_source_weekly_sums.call_args_list
+    assert [c.args for c in calls] == [(ENTITY_IDS, RECENT_WEEKS), ([12], SETTLED_WEEKS)]
+    assert _covered(detector) == (
+        {(e, w) for e in ENTITY_IDS for w in RECENT_WEEKS} | {(12, w) for w in SETTLED_WEEKS}
+    )
+
+
+def test_historical_matrix_averages_cached_totals(detector):
+    detector.statistical_db.get_source_entity_weekly_coverage.return_value = {}
+    detector.statistical_db.get_source_entity_sentiment_totals.return_value = [
+        (1, 11, 3.0, 4), (2, 13, -1.0, 2), (9, 12, 5.0, 5), (2, 12, 0.0, 0)
+    ]
+
+    values, present = detector._build_historical_sentiment_matrix([1, 2], ENTITY_IDS, WEEK_STARTS)
+
+    assert present.tolist() == [[True, False, False], [False, False, True]]
+    assert values[0, 0] == pytest.approx(0.75)
+    assert values[1, 2] == pytest.approx(-0.5)
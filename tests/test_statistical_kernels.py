@@ -0,0 +1,254 @@
+"""
+Tests for the vectorized statistical kernels of the intelligence analyzers.
+
+Each kernel is checked against the straightforward scipy/numpy computation
+it replaces, plus the edge cases the analyzers rely on.
+"""
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from intelligence.sentiment_anomaly_detector import SentimentAnomalyDetector, _triage
+from intelligence.source_divergence_detector import (
+    SYRK_MIN_ROWS,
+    _correlation_change_p_values,
+    _gram,
+    _pairwise_correlations,
+    _row_pair_correlations,
+)
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(20261017)
+
+
+def _sentiment_matrix(rng, sources, entities, coverage=0.7):
+    """Random float32 sentiment matrix with missing entries zeroed, plus its presence mask."""
+    present = rng.random((sources, entities)) < coverage
+    values = np.where(present, rng.uniform(-2.0, 2.0, (sources, entities)), 0.0).astype(np.float32)
+    return values, present
+
+
+def _pearsonr_over_shared(values, present, i, j):
+    shared = present[i] & present[j]
+    return stats.pearsonr(values[i, shared].astype(np.float64), values[j, shared].astype(np.float64))[0]
+
+
+# _triage
+
+def test_triage_matches_normal_tail_probabilities():
+    means = np.array([0.0, 0.5, -0.2, 1.0, 0.0])
+    std_devs = np.array([0.1, 0.2, 0.05, 0.3, 0.01])
+    currents = np.array([0.15, 1.5, -0.2, 0.0, 0.05])
+
+    significant, z_scores, p_values, severity_scores, change_percents = _triage(
+        currents, means, std_devs, 0.01
+    )
+
+    expected_z = (currents - means) / std_devs
+    expected_p = 2 * stats.norm.sf(np.abs(expected_z))
+    expected = np.flatnonzero((np.abs(expected_z) > 2) & (expected_p < 0.01))
+
+    np.testing.assert_array_equal(significant, expected)
+    np.testing.assert_allclose(z_scores, expected_z[expected])
+    np.testing.assert_allclose(p_values, expected_p[expected], rtol=1e-10)
+    np.testing.assert_allclose(severity_scores, np.minimum(1.0, np.abs(expected_z[expected]) / 5))
+
+
+def test_triage_keeps_tiny_p_values_for_large_z():
+    # float32 erfc underflows to 0 from about |z| = 14
+    means = np.zeros(3)
+    std_devs = np.full(3, 0.1)
+    currents = np.array([1.5, -2.0, 3.0])
+
+    significant, z_scores, p_values, _, _ = _triage(currents, means, std_devs, 0.01)
+
+    np.testing.assert_array_equal(significant, [0, 1, 2])
+    np.testing.assert_allclose(z_scores, [15.0, -20.0, 30.0])
+    assert np.all(p_values > 0)
+    np.testing.assert_allclose(p_values, 2 * stats.norm.sf([15.0, 20.0, 30.0]), rtol=1e-10)
+
+
+def test_triage_change_percent_is_zero_for_zero_baseline():
+    significant, _, _, _, change_percents = _triage(
+        np.array([1.0, 1.5]), np.array([0.0, 0.5]), np.array([0.1, 0.1]), 0.01
+    )
+
+    np.testing.assert_array_equal(significant, [0, 1])
+    np.testing.assert_allclose(change_percents, [0.0, 200.0])
+
+
+def test_triage_ignores_shifts_within_two_std():
+    significant, z_scores, _, _, _ = _triage(
+        np.array([0.1, -0.1]), np.zeros(2), np.array([0.1, 0.1]), 0.05
+    )
+
+    assert significant.size == 0
+    assert z_scores.size == 0
+
+
+# _pairwise_correlations
+
+def test_pairwise_correlations_match_pearsonr(rng):
+    values, present = _sentiment_matrix(rng, 12, 40)
+
+    correlations, common = _pairwise_correlations(values, present)
+
+    for i in range(values.shape[0]):
+        for j in range(values.shape[0]):
+            assert common[i, j] == np.sum(present[i] & present[j])
+            if i != j:
+                assert correlations[i, j] == pytest.approx(
+                    _pearsonr_over_shared(values, present, i, j), abs=1e-9
+                )
+
+
+def test_pairwise_correlations_survive_large_common_offset(rng):
+    # Near-constant sentiment is where the one-pass formula cancels
+    present = np.ones((6, 50), dtype=bool)
+    values = (0.9 + 1e-3 * rng.standard_normal((6, 50))).astype(np.float32)
+
+    correlations, _ = _pairwise_correlations(values, present)
+
+    for i, j in zip(*np.triu_indices(6, k=1)):
+        assert correlations[i, j] == pytest.approx(
+            _pearsonr_over_shared(values, present, i, j), abs=1e-6
+        )
+
+
+def test_pairwise_correlations_are_nan_for_zero_std():
+    present = np.ones((3, 10), dtype=bool)
+    values = np.vstack([
+        np.full(10, 0.4),
+        np.arange(10),
+        np.arange(10)[::-1]
+    ]).astype(np.float32)
+
+    correlations, _ = _pairwise_correlations(values, present)
+
+    assert np.isnan(correlations[0, 1]) and np.isnan(correlations[1, 0])
+    assert np.isnan(correlations[0, 2])
+
+
+def test_pairwise_correlations_stay_within_unit_interval_for_perfect_pairs():
+    present = np.ones((3, 10), dtype=bool)
+    base = np.linspace(-1.0, 1.0, 10)
+    values = np.vstack([base, 0.3 * base + 0.7, -2.0 * base - 0.1]).astype(np.float32)
+
+    correlations, _ = _pairwise_correlations(values, present)
+
+    assert np.all(np.abs(correlations) <= 1.0)
+    assert correlations[0, 1] == pytest.approx(1.0)
+    assert correlations[0, 2] == pytest.approx(-1.0)
+
+
+def test_pairwise_correlations_use_only_shared_entities():
+    values = np.array([
+        [1.0, 2.0, 3.0, 4.0, 0.0],
+        [2.0, 4.0, 6.0, 0.0, 5.0]
+    ], dtype=np.float32)
+    present = values != 0
+
+    correlations, common = _pairwise_correlations(values, present)
+
+    assert common[0, 1] == 3
+    assert correlations[0, 1] == pytest.approx(1.0)
+
+
+def test_gram_syrk_path_matches_matmul(rng):
+    matrix = rng.standard_normal((SYRK_MIN_ROWS + 20, 30))
+
+    np.testing.assert_allclose(_gram(matrix), matrix @ matrix.T, rtol=1e-10, atol=1e-10)
+
+
+def test_row_pair_correlations_match_pearsonr(rng):
+    values, present = _sentiment_matrix(rng, 8, 40)
+    first, second = np.triu_indices(8, k=1)
+
+    correlations, common = _row_pair_correlations(values, present, first, second)
+
+    for k, (i, j) in enumerate(zip(first, second)):
+        assert common[k] == np.sum(present[i] & present[j])
+        assert correlations[k] == pytest.approx(_pearsonr_over_shared(values, present, i, j), abs=1e-5)
+
+
+# _correlation_change_p_values
+
+def test_correlation_change_p_values_match_fisher_z_test():
+    historical = np.array([0.9, 0.8, 0.75, 0.95])
+    recent = np.array([0.2, 0.7, -0.3, 0.94])
+    historical_sizes = np.array([40, 25, 12, 50])
+    recent_sizes = np.array([30, 20, 9, 50])
+
+    p_values = _correlation_change_p_values(historical, historical_sizes, recent, recent_sizes)
+
+    z_stat = np.abs(np.arctanh(historical) - np.arctanh(recent)) / np.sqrt(
+        1 / (historical_sizes - 3) + 1 / (recent_sizes - 3)
+    )
+    np.testing.assert_allclose(p_values, 2 * stats.norm.sf(z_stat), rtol=1e-10)
+
+
+def test_correlation_change_p_values_need_eight_shared_entities():
+    p_values = _correlation_change_p_values(
+        np.array([0.9, 0.9, 0.9]), np.array([7, 8, 30]),
+        np.array([-0.9, -0.9, -0.9]), np.array([30, 7, 8])
+    )
+
+    np.testing.assert_array_equal(p_values, [1.0, 1.0, p_values[2]])
+    assert p_values[2] < 1.0
+
+
+def test_correlation_change_p_values_are_finite_for_perfect_correlation():
+    p_values = _correlation_change_p_values(
+        np.array([1.0, -1.0, 1.0]), np.array([20, 20, 20]),
+        np.array([1.0, 1.0, 0.5]), np.array([20, 20, 20])
+    )
+
+    assert np.all(np.isfinite(p_values))
+    assert p_values[0] == pytest.approx(1.0)
+    assert p_values[1] < 1e-10
+
+
+# _combine_weekly_partials
+
+@pytest.fixture
+def detector():
+    # _combine_weekly_partials needs no database, so skip __init__
+    return SentimentAnomalyDetector.__new__(SentimentAnomalyDetector)
+
+
+def _weekly_partials(samples):
+    return [{
+        'sum_value': float(np.sum(week)),
+        'sum_squares': float(np.sum(np.square(week))),
+        'sample_count': len(week),
+        'min_value': float(np.min(week)) if len(week) else None,
+        'max_value': float(np.max(week)) if len(week) else None
+    } for week in samples]
+
+
+def test_combine_weekly_partials_matches_numpy(detector, rng):
+    samples = [rng.uniform(-2.0, 2.0, size) for size in (5, 0, 17, 9, 0, 30)]
+    pooled = np.concatenate(samples)
+
+    baseline = detector._combine_weekly_partials(_weekly_partials(samples))
+
+    assert baseline['sample_count'] == pooled.size
+    assert baseline['mean'] == pytest.approx(np.mean(pooled), abs=1e-12)
+    assert baseline['std_dev'] == pytest.approx(np.std(pooled), rel=1e-9)
+    assert baseline['min_value'] == np.min(pooled)
+    assert baseline['max_value'] == np.max(pooled)
+
+
+def test_combine_weekly_partials_needs_twenty_samples(detector):
+    assert detector._combine_weekly_partials(_weekly_partials([np.ones(10), np.ones(9)])) is None
+    assert detector._combine_weekly_partials([]) is None
+
+
+def test_combine_weekly_partials_floors_zero_std(detector):
+    baseline = detector._combine_weekly_partials(_weekly_partials([np.full(12, 0.3), np.full(12, 0.3)]))
+
+    assert baseline['mean'] == pytest.approx(0.3)
+    assert baseline['std_dev'] == 0.01